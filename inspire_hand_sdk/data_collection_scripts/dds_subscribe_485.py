@@ -1,6 +1,7 @@
 from unitree_sdk2py.core.channel import ChannelSubscriber, ChannelFactoryInitialize
 
 from inspire_sdkpy import inspire_hand_defaut,inspire_dds
+from inspire_sdkpy.register_map import get_register_map
 
 import numpy as np
 import colorcet  
@@ -18,6 +19,7 @@ class DDSHandler():
         else:
             ChannelFactoryInitialize(0, network)
         self.data=inspire_hand_defaut.data_sheet
+        self.register_map=get_register_map(self.data)
         if sub_touch:
             self.sub_touch = ChannelSubscriber("rt/inspire_hand/touch/"+LR, inspire_dds.inspire_hand_touch)
             self.sub_touch.Init(self.update_data_touch, 10)
@@ -33,11 +35,11 @@ class DDSHandler():
     def update_data_touch(self,msg:inspire_dds.inspire_hand_touch):
         with self.data_touch_lock:
             start_time = time.time()  # 记录开始时间
-            for i, (name, addr, length, size,var) in enumerate(self.data):
-                value=getattr(msg,var)
+            for region in self.register_map.regions:
+                value=getattr(msg,region.var)
                 if value is not None:
-                    matrix = np.array(value).reshape(size)
-                    self.touch[var]=matrix
+                    matrix = np.array(value).reshape(region.shape)
+                    self.touch[region.var]=matrix
             end_time = time.time()  # 记录结束时间
             elapsed_time = end_time - start_time  # 计算耗时
             # print(f"Data update time: {elapsed_time:.6f} seconds")  # 打印耗时
@@ -13,13 +13,14 @@ from scipy.ndimage import zoom
 
 from dds_subscribe_485 import DDSHandler
 from inspire_sdkpy import inspire_hand_defaut
+from inspire_sdkpy.register_map import get_register_map
 
 # Set maximum raw data
 max_raw_data = 4095
 
 def get_sensor_regions_on_hand():
     """Map each sensor from data_sheet to its location on the hand visualization"""
-    data_sheet = inspire_hand_defaut.data_sheet
+    register_map = get_register_map(inspire_hand_defaut.data_sheet)
     finger_base_x = 0.22
     finger_base_y = 0.42
     finger_width = 0.08
@@ -30,39 +31,32 @@ def get_sensor_regions_on_hand():
     
     regions = {}
     
-    for name, addr, length, size, var in data_sheet:
-        if 'fingerone' in var: finger_idx = 0
-        elif 'fingertwo' in var: finger_idx = 1
-        elif 'fingerthree' in var: finger_idx = 2
-        elif 'fingerfour' in var: finger_idx = 3
-        else: finger_idx = None
-        
-        if finger_idx is not None:
-            finger_center_x = finger_base_x + finger_idx * finger_spacing + finger_width / 2
-            if 'tip' in var: x, y, w, h = finger_center_x-0.015, finger_base_y+finger_length-0.05, 0.03, 0.03
-            elif 'top' in var or 'palm' in var: x, y, w, h = finger_center_x-0.03, finger_base_y+finger_length*0.55 if 'top' in var else finger_base_y+finger_length*0.22, 0.06, 0.12
-        elif 'fingerfive' in var:  # Thumb
+    for region in register_map:
+        segment = region.segment
+        if region.finger_index is not None and region.finger_index < 4:  # fingerone .. fingerfour
+            finger_center_x = finger_base_x + region.finger_index * finger_spacing + finger_width / 2
+            if segment == 'tip': x, y, w, h = finger_center_x-0.015, finger_base_y+finger_length-0.05, 0.03, 0.03
+            elif segment in ('top', 'palm'): x, y, w, h = finger_center_x-0.03, finger_base_y+finger_length*0.55 if segment == 'top' else finger_base_y+finger_length*0.22, 0.06, 0.12
+        elif region.finger == 'fingerfive':  # Thumb
             thumb_center_x = thumb_x + thumb_width/2
             w = 0.06
-            if 'tip' in var: h = thumb_length*0.08; w=thumb_width*0.5; x=thumb_center_x-w/2; y=thumb_y+thumb_length*0.95
-            elif 'top' in var: h=0.08; x=thumb_center_x-w/2; y=thumb_y+thumb_length*0.7
-            elif 'middle' in var or 'mid' in var: h=0.08; x=thumb_center_x-w/2; y=thumb_y+thumb_length*0.43
-            elif 'palm' in var: h=0.10; x=thumb_center_x-w/2; y=thumb_y+thumb_length*0.10
-        elif 'palm_touch' in var:
+            if segment == 'tip': h = thumb_length*0.08; w=thumb_width*0.5; x=thumb_center_x-w/2; y=thumb_y+thumb_length*0.95
+            elif segment == 'top': h=0.08; x=thumb_center_x-w/2; y=thumb_y+thumb_length*0.7
+            elif segment == 'middle': h=0.08; x=thumb_center_x-w/2; y=thumb_y+thumb_length*0.43
+            elif segment == 'palm': h=0.10; x=thumb_center_x-w/2; y=thumb_y+thumb_length*0.10
+        elif region.finger == 'palm':
             palm_center_x = (palm_x+palm_width/2)+0.05
             w,h=0.18,0.16; x=(palm_center_x-w/2)-0.05; y=palm_y+0.12
         
-        regions[var] = {'bbox': (x, y, w, h), 'size': size, 'name': name}
+        regions[region.var] = {'bbox': (x, y, w, h), 'size': region.shape, 'name': region.name}
     return regions
 
 def upsample(data, scale=2):
     return zoom(data, zoom=scale, order=1)
 
-def orient_sensor(var, data):
-    if 'finger' in var and 'fingerfive' not in var: return np.flipud(data)
-    if 'fingerfive' in var: return np.flipud(data)
-    if 'palm_touch' in var: return np.rot90(data, k=1)
-    return data
+def orient_sensor(region, data):
+    if region.finger == 'palm': return np.rot90(data, k=1)
+    return np.flipud(data)
 
 def draw_hand_outline(ax):
     palm = patches.Rectangle((0.23,0.1),0.35,0.3,linewidth=2,edgecolor='black',facecolor='lightgray',alpha=0.2)
@@ -102,7 +96,7 @@ def setup_csv_logging(sensor_regions):
 
 def main():
     dds_handler = DDSHandler(sub_touch=True)
-    data_sheet = inspire_hand_defaut.data_sheet
+    register_map = get_register_map(inspire_hand_defaut.data_sheet)
     sensor_regions = get_sensor_regions_on_hand()
     
     # CSV logging setup
@@ -119,10 +113,11 @@ def main():
     draw_hand_outline(ax)
     
     sensor_images = {}
-    for name, addr, length, size, var in data_sheet:
+    for region in register_map:
+        var = region.var
         if var in sensor_regions:
             x,y,w,h = sensor_regions[var]['bbox']
-            img_data = np.zeros(size)
+            img_data = np.zeros(region.shape)
             im = ax.imshow(img_data, extent=[x,x+w,y,y+h], origin='lower',
                            cmap=blue_yellow_cmap, alpha=0.8, vmin=0, vmax=100,
                            interpolation='nearest')
@@ -144,19 +139,20 @@ def main():
             data_dict = dds_handler.read()
             touch_data = data_dict.get('touch', {})
             
-            for name, addr, length, size, var in data_sheet:
+            for region in register_map:
+                var = region.var
                 if var in touch_data and var in sensor_images:
                     sensor_matrix = touch_data[var]
                     if sensor_matrix is None or sensor_matrix.size==0: continue
-                    if sensor_matrix.shape != size:
-                        try: sensor_matrix = sensor_matrix.reshape(size)
+                    if sensor_matrix.shape != region.shape:
+                        try: sensor_matrix = sensor_matrix.reshape(region.shape)
                         except: continue
                     if var not in baselines: baselines[var]=sensor_matrix.copy(); smoothed_data[var]=sensor_matrix.copy()
                     relative_data = np.clip(sensor_matrix - baselines[var],0.0,max_raw_data)
                     smoothed_data[var] = relative_data.copy()
                     
-                    display_data = orient_sensor(var, smoothed_data[var])
-                    if 'fingerfive' in var and ('mid' in var or 'middle' in var):
+                    display_data = orient_sensor(region, smoothed_data[var])
+                    if region.finger == 'fingerfive' and region.segment == 'middle':
                         display_data = upsample(display_data, scale=2)
                     sensor_images[var].set_data(display_data)
                     sensor_images[var].set_clim(0,max_raw_data)
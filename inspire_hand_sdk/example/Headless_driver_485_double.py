@@ -1,7 +1,12 @@
 from inspire_sdkpy import inspire_sdk_double, inspire_hand_defaut
+from inspire_sdkpy.scheduler import MultiRateScheduler
+import argparse
 import time
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--multi-rate', action='store_true', help="read every state register group at its own rate (angle 200 Hz ... temperature 1 Hz) instead of dropping fields")
+    args = parser.parse_args()
     
     ## publish All Data
     # states_structure = [
@@ -24,6 +29,9 @@ if __name__ == "__main__":
     handler = inspire_sdk_double.ModbusDataHandlerDouble(device_id=[2,1], use_serial=True, serial_port='/dev/ttyUSB0',states_structure=states_structure) # l r
     time.sleep(0.5)
 
+    if args.multi_rate:
+        handler = MultiRateScheduler.for_handler(handler)  # scheduler.read() returns the same [l, r] frames as handler.read()
+
     call_count = 0  # 记录调用次数
     start_time = time.perf_counter()  # 记录开始时间
 
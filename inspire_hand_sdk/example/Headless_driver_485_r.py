@@ -1,7 +1,13 @@
-from inspire_sdkpy import inspire_sdk, inspire_hand_defaut
+from inspire_sdkpy import inspire_sdk, inspire_hand_defaut, touch_cycle
+import argparse
 import time
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--serial-touch', action='store_true', help="also read the tactile data (set the hand and --baudrate to 921600)")
+    parser.add_argument('--baudrate', type=int, default=115200, choices=sorted(inspire_hand_defaut.baud_rates.values()))
+    parser.add_argument('--touch-divisors', action='store_true', help="read fingertips every frame, pads and palm every 4th (touch_cycle.SERIAL_TOUCH_DIVISORS)")
+    args = parser.parse_args()
     
     ## publish All Data
     # states_structure = [
@@ -21,7 +27,10 @@ if __name__ == "__main__":
             ('status', 1612, 3, 'byte'),
         ]
     
-    handler = inspire_sdk.ModbusDataHandler(LR='r', device_id=1, use_serial=True, serial_port='/dev/ttyUSB1',states_structure=states_structure)
+    ## 串口读取触觉数据: --serial-touch --baudrate 921600 (手也设置为 921600), 加 --touch-divisors 时指端每帧读取, 指腹/掌心每 4 帧读取一次
+    handler = inspire_sdk.ModbusDataHandler(LR='r', device_id=1, use_serial=True, serial_port='/dev/ttyUSB1', baudrate=args.baudrate,
+                                            states_structure=states_structure, serial_touch=args.serial_touch,
+                                            touch_divisors=touch_cycle.SERIAL_TOUCH_DIVISORS if args.touch_divisors else None)
 
     call_count = 0  # 记录调用次数
     start_time = time.perf_counter()  # 记录开始时间
@@ -0,0 +1,55 @@
+import asyncio
+import time
+from inspire_sdkpy import async_engine, inspire_dds
+from inspire_sdkpy.control import ControlMailbox
+from unitree_sdk2py.core.channel import ChannelPublisher, ChannelSubscriber, ChannelFactoryInitialize
+
+
+async def main(ip='192.168.123.210', LR='r', device_id=1):
+    engine = async_engine.AsyncModbusEngine(ip=ip, device_id=device_id)
+    await engine.connect()
+    loop = asyncio.get_running_loop()
+
+    ChannelFactoryInitialize(0)
+    pub = ChannelPublisher("rt/inspire_hand/touch/"+LR, inspire_dds.inspire_hand_touch)
+    pub.Init()
+    state_pub = ChannelPublisher("rt/inspire_hand/state/"+LR, inspire_dds.inspire_hand_state)
+    state_pub.Init()
+
+    # 控制指令在 DDS 线程中收到, 只保留最新一条, 交给事件循环与读请求一起发送
+    control = ControlMailbox()
+
+    async def flush_control():
+        for address, values in control.take():
+            await engine.write_registers(address, values)
+
+    def write_registers_callback(msg: inspire_dds.inspire_hand_ctrl):
+        control.submit(msg)
+        asyncio.run_coroutine_threadsafe(flush_control(), loop)
+
+    sub = ChannelSubscriber("rt/inspire_hand/ctrl/"+LR, inspire_dds.inspire_hand_ctrl)
+    sub.Init(write_registers_callback, 10)
+
+    call_count = 0  # 记录调用次数
+    start_time = time.perf_counter()  # 记录开始时间
+
+    def publish(frame):
+        nonlocal call_count
+        pub.Write(frame['touch_msg'])
+        state_pub.Write(frame['states_msg'])
+        call_count += 1
+        if call_count % 100 == 0:
+            elapsed_time = time.perf_counter() - start_time  # 计算总耗时
+            print(f"当前频率: {call_count / elapsed_time:.2f} Hz, 调用次数: {call_count}, 耗时: {elapsed_time:.6f} 秒")
+
+    try:
+        await engine.run(publish)
+    finally:
+        await engine.close()
+
+
+if __name__ == "__main__":
+    try:
+        asyncio.run(main())
+    except KeyboardInterrupt:
+        print("程序结束")
@@ -1,13 +1,15 @@
 # from inspire_dds import inspire_hand_touch,inspire_hand_ctrl,inspire_hand_state
 # from inspire_dds import inspire_hand_touch,inspire_hand_ctrl,inspire_hand_state
 import sys
-from inspire_sdkpy import qt_tabs,inspire_sdk,inspire_hand_defaut
+from inspire_sdkpy import qt_tabs,inspire_sdk,inspire_hand_defaut,acquisition
 # import inspire_sdkpy
 if __name__ == "__main__":
     app = qt_tabs.QApplication(sys.argv)
     # handler=inspire_sdk.ModbusDataHandler(ip=inspire_hand_defaut.defaut_ip,LR='r',device_id=1)
     handler=inspire_sdk.ModbusDataHandler(ip='192.168.123.210',LR='r',device_id=1)
-    window = qt_tabs.MainWindow(data_handler=handler,dt=20,name="Hand Vision Driver")
+    # 后台线程持续读取并发布 DDS, 界面定时器只取最新一帧, 不等待 Modbus
+    service=acquisition.AcquisitionService(handler).start()
+    window = qt_tabs.MainWindow(data_handler=service,dt=20,name="Hand Vision Driver")
     window.reflash()
     window.show()
     sys.exit(app.exec_())
\ No newline at end of file
@@ -1,12 +1,14 @@
 import multiprocessing
 import time
-from inspire_sdkpy import qt_tabs,inspire_sdk,inspire_hand_defaut
+from inspire_sdkpy import qt_tabs,inspire_sdk,inspire_hand_defaut,acquisition
 import sys
 
 def worker(ip,LR,name,network=None):
     app = qt_tabs.QApplication(sys.argv)
     handler=inspire_sdk.ModbusDataHandler(network=network,ip=ip, LR=LR, device_id=1)
-    window = qt_tabs.MainWindow(data_handler=handler,dt=20,name="Hand Vision Driver")
+    # 后台线程持续读取并发布 DDS, 界面定时器只取最新一帧, 不等待 Modbus
+    service=acquisition.AcquisitionService(handler).start()
+    window = qt_tabs.MainWindow(data_handler=service,dt=20,name="Hand Vision Driver")
     window.reflash()
     window.show()
     sys.exit(app.exec_())
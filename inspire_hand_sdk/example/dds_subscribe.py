@@ -1,6 +1,8 @@
 from unitree_sdk2py.core.channel import ChannelSubscriber, ChannelFactoryInitialize
 
 from inspire_sdkpy import inspire_hand_defaut,inspire_dds
+from inspire_sdkpy.register_decode import decode_touch_flat
+from inspire_sdkpy.register_map import get_register_map
 
 import numpy as np
 import colorcet  
@@ -11,19 +13,39 @@ import threading
 
 
 class DDSHandler():
-    def __init__(self,network=None,sub_touch=True,LR='r'):
+    def __init__(self,network=None,sub_touch=True,LR='r',stamped=False,flat_touch=False):
         super().__init__()  # 调用父类的 __init__ 方法
         if network ==None:
             ChannelFactoryInitialize(0)
         else:
             ChannelFactoryInitialize(0, network)
         self.data=inspire_hand_defaut.data_sheet
+        self.register_map=get_register_map(self.data)
+        # stamped=True: 订阅驱动以 stamped=True 发布的带帧序号和采集时间的话题
+        self.latency_ms = None   # 最新状态帧从采集结束到收到的延迟 (同一台机器)
+        self.dropped = 0         # 按帧序号统计的丢帧数
+        self.last_seq = None
+        self.touch_seq = None    # 触觉与状态帧序号相同表示同一次采集
+        self.state_seq = None
+        # flat_touch=True: 订阅驱动以 flat_touch=True 发布的扁平触觉帧, self.taxels 为全部 1062 个触觉点
+        self.taxels = None
         if sub_touch:
-            self.sub_touch = ChannelSubscriber("rt/inspire_hand/touch/"+LR, inspire_dds.inspire_hand_touch)
-            self.sub_touch.Init(self.update_data_touch, 10)
+            if flat_touch:
+                self.sub_touch = ChannelSubscriber("rt/inspire_hand/touch_flat/"+LR, inspire_dds.inspire_hand_touch_flat)
+                self.sub_touch.Init(self.update_data_touch_flat, 10)
+            elif stamped:
+                self.sub_touch = ChannelSubscriber("rt/inspire_hand/touch_stamped/"+LR, inspire_dds.inspire_hand_touch_stamped)
+                self.sub_touch.Init(self.update_data_touch_stamped, 10)
+            else:
+                self.sub_touch = ChannelSubscriber("rt/inspire_hand/touch/"+LR, inspire_dds.inspire_hand_touch)
+                self.sub_touch.Init(self.update_data_touch, 10)
         
-        self.sub_states = ChannelSubscriber("rt/inspire_hand/state/"+LR, inspire_dds.inspire_hand_state)
-        self.sub_states.Init(self.update_data_state, 10)
+        if stamped:
+            self.sub_states = ChannelSubscriber("rt/inspire_hand/state_stamped/"+LR, inspire_dds.inspire_hand_state_stamped)
+            self.sub_states.Init(self.update_data_state_stamped, 10)
+        else:
+            self.sub_states = ChannelSubscriber("rt/inspire_hand/state/"+LR, inspire_dds.inspire_hand_state)
+            self.sub_states.Init(self.update_data_state, 10)
         self.touch={}
         self.states={}
         self.data_touch_lock = threading.Lock()
@@ -34,15 +56,37 @@ class DDSHandler():
     def update_data_touch(self,msg:inspire_dds.inspire_hand_touch):
         with self.data_touch_lock:
             start_time = time.time()  # 记录开始时间
-            for i, (name, addr, length, size,var) in enumerate(self.data):
-                value=getattr(msg,var)
+            for region in self.register_map.regions:
+                value=getattr(msg,region.var)
                 if value is not None:
-                    matrix = np.array(value).reshape(size)
-                    self.touch[var]=matrix
+                    matrix = np.array(value).reshape(region.shape)
+                    self.touch[region.var]=matrix
             end_time = time.time()  # 记录结束时间
             elapsed_time = end_time - start_time  # 计算耗时
             # print(f"Data update time: {elapsed_time:.6f} seconds")  # 打印耗时
             
+    def update_data_touch_stamped(self,msg:inspire_dds.inspire_hand_touch_stamped):
+        self.touch_seq = msg.stamp.seq
+        self.update_data_touch(msg.touch)
+
+    def update_data_touch_flat(self,msg:inspire_dds.inspire_hand_touch_flat):
+        # 一次转换为 int16 数组, 各区域矩阵为其视图
+        taxels, matrixs = decode_touch_flat(msg, self.register_map)
+        with self.data_touch_lock:
+            self.touch_seq = msg.stamp.seq
+            self.taxels = taxels
+            self.touch.update(matrixs)
+
+    def update_data_state_stamped(self,msg:inspire_dds.inspire_hand_state_stamped):
+        # CLOCK_MONOTONIC 在同一台机器的进程间可直接比较
+        self.latency_ms = (time.monotonic_ns() - msg.stamp.acq_end_ns) / 1e6
+        # seq <= last_seq: 驱动重启 (帧序号从 1 重新开始) 或乱序, 只重新同步, 不计入丢帧
+        if self.last_seq is not None and msg.stamp.seq > self.last_seq:
+            self.dropped += msg.stamp.seq - self.last_seq - 1
+        self.last_seq = msg.stamp.seq
+        self.state_seq = msg.stamp.seq
+        self.update_data_state(msg.state)
+
     def update_data_state(self,states_msg:inspire_dds.inspire_hand_state):
         with self.data_state_lock:
             self.states= {
@@ -74,6 +118,8 @@ from inspire_sdkpy import qt_tabs,inspire_sdk,inspire_hand_defaut
 if __name__ == "__main__":
     ddsHandler = DDSHandler(LR='r')
     # ddsHandler = DDSHandler(LR='l')
+    # ddsHandler = DDSHandler(LR='r',stamped=True) # 驱动以 stamped=True 运行时, 可读取 latency_ms / dropped
+    # ddsHandler = DDSHandler(LR='r',flat_touch=True) # 驱动以 flat_touch=True 运行时
 
     app = qt_tabs.QApplication(sys.argv)
     window = qt_tabs.MainWindow(data_handler=ddsHandler,dt=55,name="DDS Subscribe") # Update every 50 ms
@@ -4,6 +4,8 @@ from PyQt5.QtWidgets import QApplication, QMainWindow, QPushButton, QVBoxLayout,
 from pymodbus.exceptions import ConnectionException
 
 from inspire_sdkpy import defaut_ip
+from inspire_sdkpy.inspire_hand_defaut import baud_rates
+from inspire_sdkpy.discovery import scan_serial_port
 
 registers = {
     1000: {"name": "HAND_ID", "description": "灵巧手 ID", "length": 1},
@@ -20,12 +22,6 @@ register_set={
 
 }
 
-baud_rates = {
-    0: 115200,
-    1: 57600,
-    2: 19200,
-    3: 921600
-}
 baud_rates_reverse = {value: key for key, value in baud_rates.items()}
 
 
@@ -80,15 +76,11 @@ class MainWindow(QMainWindow):
             print("未找到任何在线设备")
         
     def find_online_devices(self, port):
-        for baudrate, rate_value in baud_rates.items():
-            for device_id in range(100):  # 假设设备 ID 范围为 0 到 99
-                modbus = ModbusHandler(port, rate_value, device_id)
-                res = modbus.read_register(1000, 1)  # 尝试读取寄存器 1000
-                if res is not None:
-                    print(f"找到在线设备: ID = {device_id}，波特率 = {rate_value}")
-                    modbus.close()
-                    return device_id, rate_value
-                modbus.close()
+        # 每个波特率只打开一次串口, 按帧时间设置超时, 找到第一只手即返回
+        hands = scan_serial_port(port, max_devices=1)
+        if hands:
+            print(f"找到在线设备: ID = {hands[0].device_id}，波特率 = {hands[0].baudrate}")
+            return hands[0].device_id, hands[0].baudrate
         print("未找到在线设备")
         return None, None
             
@@ -226,5 +218,6 @@ class MainWindow(QMainWindow):
 
 if __name__ == '__main__':
     app = QApplication(sys.argv)
-    window = MainWindow(port='/dev/ttyUSB1', baudrate=115200)  # 替换为实际的串口名称
+    # 替换为实际的串口名称, 也可传入模拟器的 pty: python -m inspire_sdkpy.simulator --rtu
+    window = MainWindow(port=sys.argv[1] if len(sys.argv) > 1 else '/dev/ttyUSB1', baudrate=115200)
     sys.exit(app.exec_())
@@ -0,0 +1,19 @@
+import sys
+from inspire_sdkpy import qt_tabs
+from inspire_sdkpy.shm_ring import ShmFrameReader
+
+# 与驱动在同一台机器上运行: 驱动需以 shm=True 启动, 例如
+# ModbusDataHandler(ip=defaut_ip, LR='r', shm=True)
+if __name__ == "__main__":
+    reader = ShmFrameReader('inspire_hand_r')
+    # reader = ShmFrameReader('inspire_hand_l')
+
+    # 策略等进程可直接取最新帧, copy=False 为零拷贝视图, 用完后用 is_valid 检查是否已被覆盖
+    # frame = reader.latest(copy=False)
+    # frame.taxels, frame.touch['palm_touch'], frame.states_dict()['ANGLE_ACT'], reader.is_valid(frame)
+
+    app = qt_tabs.QApplication(sys.argv)
+    window = qt_tabs.MainWindow(data_handler=reader, dt=20, name="Shared Memory Subscribe")
+    window.reflash()
+    window.show()
+    sys.exit(app.exec_())
@@ -8,11 +8,19 @@
 from .inspire_hand_defaut import *
 from . import inspire_dds
 from .inspire_sdk import ModbusDataHandler
+from .acquisition import AcquisitionService
+from .register_map import RegisterMap, get_register_map
+from .shm_ring import ShmFrameReader, ShmFrameWriter
 from .qt_tabs import ImageTab,MainWindow,CurveTab
 
 __all__ = [
 	"inspire_dds",
 	"ModbusDataHandler",
+	"AcquisitionService",
+	"RegisterMap",
+	"get_register_map",
+	"ShmFrameReader",
+	"ShmFrameWriter",
   "ImageTab",
   "MainWindow",
   "CurveTab"
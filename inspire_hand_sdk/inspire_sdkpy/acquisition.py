@@ -0,0 +1,101 @@
+import threading
+import time
+
+
+class AcquisitionService:
+    def __init__(self, handler, history_length=100, interval=0.0):
+        """_summary_
+        Owns the handler's Modbus link in a background thread that calls handler.read() continuously.
+        Consumers take the newest frame with latest() or read() and never wait for Modbus I/O or for each other.
+        Args:
+            handler (ModbusDataHandler | ModbusDataHandlerDouble): Driver that does the reading and DDS publishing.
+            history_length (int, optional): Number of frames kept in the history ring. Defaults to 100.
+            interval (float, optional): Minimum period between two reads in seconds. Defaults to 0.0, read back to back.
+        """
+        self.handler = handler
+        self.history_length = history_length
+        self.interval = interval
+        # 环形缓冲: 写线程只替换槽位引用和计数, 读取方无需加锁
+        self._ring = [None] * history_length
+        self._count = 0
+        self._latest = None
+        self._first_frame = threading.Event()
+        self._quit = threading.Event()
+        self._thread = None
+
+    def start(self):
+        if self._thread is None:
+            self._quit.clear()
+            self._thread = threading.Thread(target=self._run, name="inspire_acquisition", daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self, timeout=None):
+        self._quit.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+
+    def latest(self):
+        """Newest frame as returned by handler.read(), or None before the first frame. Never blocks."""
+        latest = self._latest
+        return None if latest is None else latest[1]
+
+    def latest_stamped(self):
+        """(timestamp, frame) of the newest frame, timestamp is time.monotonic() when the read finished."""
+        return self._latest
+
+    def history(self):
+        """List of (timestamp, frame) from oldest to newest, at most history_length entries."""
+        while True:
+            count = self._count
+            ring = self._ring[:]
+            if count == self._count:
+                break
+        if count < self.history_length:
+            return ring[:count]
+        head = count % self.history_length
+        frames = ring[head:] + ring[:head]
+        if frames[0][0] > frames[-1][0]:
+            frames = frames[1:]  # 复制时最旧的槽位刚被新帧覆盖
+        return frames
+
+    @property
+    def frame_count(self):
+        return self._count
+
+    def read(self, timeout=0.0):
+        """_summary_
+        Drop-in for handler.read() (e.g. as MainWindow data_handler): newest frame.
+        Args:
+            timeout (float, optional): Longest wait for the first frame in seconds, None waits forever. Defaults to 0.0,
+                never blocks (a GUI thread must not hang on a hand that does not answer).
+        Returns:
+            dict: the newest frame, or None while no frame has been read yet
+        """
+        if timeout != 0.0:
+            self._first_frame.wait(timeout)
+        return self.latest()
+
+    def _run(self):
+        next_time = time.monotonic()
+        while not self._quit.is_set():
+            try:
+                frame = self.handler.read()
+            except Exception as e:
+                print(f"[AcquisitionService] read error: {e}")
+                self._quit.wait(0.1)
+                continue
+            stamped = (time.monotonic(), frame)
+            self._ring[self._count % self.history_length] = stamped
+            self._latest = stamped
+            self._count += 1
+            self._first_frame.set()
+
+            if self.interval > 0.0:
+                next_time += self.interval
+                delay = next_time - time.monotonic()
+                if delay > 0:
+                    self._quit.wait(delay)
+                else:
+                    next_time = time.monotonic()
@@ -0,0 +1,181 @@
+from .inspire_hand_defaut import *
+from .read_plan import compile_read_plan
+from .register_map import get_register_map
+from .register_decode import decode_touch, decode_states
+from .modbus_stats import register_group
+
+from pymodbus.exceptions import ModbusIOException
+
+from collections import deque
+import asyncio
+import struct
+import time
+
+READ_HOLDING_REGISTERS = 0x03
+WRITE_MULTIPLE_REGISTERS = 0x10
+
+
+class AsyncModbusEngine:
+    def __init__(self, ip=None, port=6000, device_id=1, data=data_sheet, states_structure=None, max_in_flight=8, timeout=1.0, stats=None):
+        """_summary_
+        Asyncio acquisition engine for one hand over Modbus TCP. Several read transactions are kept in
+        flight at once (distinct MBAP transaction ids) and complete touch+state frames are assembled as
+        the responses arrive, hiding the network round trip that the blocking read() loop pays per request.
+        pymodbus 3.6 holds a client lock around every async transaction, so the engine frames Modbus TCP
+        itself on an asyncio stream instead of going through AsyncModbusTcpClient.
+        Args:
+            ip (str, optional): ModbusTcp IP. Defaults to None will use defaut_ip.
+            port (int, optional): ModbusTcp IP port. Defaults to 6000.
+            device_id (int, optional): Hand ID. Defaults to 1.
+            data (list, optional): Tactile sensor register definition. Defaults to data_sheet.
+            states_structure (list, optional): Same format as ModbusDataHandler, read as one snapshot request. Defaults to all states.
+            max_in_flight (int, optional): Maximum outstanding requests on the connection. Defaults to 8.
+            timeout (float, optional): Per request timeout in seconds. Defaults to 1.0.
+            stats (ModbusStats, optional): Record every transaction under the device label 'ip:port'. Defaults to None, disabled.
+        """
+        self.ip = defaut_ip if ip is None else ip
+        self.port = port
+        self.device_id = device_id
+        self.data = data
+        self.states_structure = states_structure or [
+            ('pos_act', 1534, 6, 'short'),
+            ('angle_act', 1546, 6, 'short'),
+            ('force_act', 1582, 6, 'short'),
+            ('current', 1594, 6, 'short'),
+            ('err', 1606, 3, 'byte'),
+            ('status', 1612, 3, 'byte'),
+            ('temperature', 1618, 3, 'byte')
+        ]
+        self.register_map = get_register_map(self.data)
+        self.touch_plan = self.register_map.plan
+        self.state_plan = compile_read_plan([(attr_name, start_address, length) for attr_name, start_address, length, data_type in self.states_structure])
+        self.max_in_flight = max_in_flight
+        self.timeout = timeout
+        self.stats = stats
+        self.name = f"{self.ip}:{self.port}"
+        if self.stats is not None:
+            self.stats.add_device(self.name, 'tcp')
+
+        self.reader = None
+        self.writer = None
+        self._receiver = None
+        self._in_flight = None
+        self._pending = {}
+        self._tid = 0
+        self._running = False
+
+    async def connect(self):
+        self.reader, self.writer = await asyncio.open_connection(self.ip, self.port)
+        self._in_flight = asyncio.Semaphore(self.max_in_flight)
+        self._receiver = asyncio.ensure_future(self._receive_loop())
+        print("Async Modbus client connected successfully.")
+
+    async def close(self):
+        self._running = False
+        if self._receiver is not None:
+            self._receiver.cancel()
+            self._receiver = None
+        if self.writer is not None:
+            self.writer.close()
+            self.writer = None
+
+    async def read_holding_registers(self, start_address, num_registers, device_id=None):
+        """Read registers, returns the list of register values or None on error."""
+        pdu = struct.pack('>BHH', READ_HOLDING_REGISTERS, start_address, num_registers)
+        response = await self._transaction(pdu, device_id)
+        if response is None:
+            return None
+        byte_count = response[1]
+        return list(struct.unpack('>%dH' % (byte_count // 2), response[2:2 + byte_count]))
+
+    async def write_registers(self, start_address, values, device_id=None):
+        """Write registers, returns True on success."""
+        values = list(values)
+        pdu = struct.pack('>BHHB%dH' % len(values), WRITE_MULTIPLE_REGISTERS, start_address, len(values), 2 * len(values),
+                          *[value & 0xFFFF for value in values])
+        return await self._transaction(pdu, device_id) is not None
+
+    async def read_frame(self):
+        """_summary_
+        Read one complete touch + state frame, all requests of both read plans are issued concurrently.
+        Returns:
+            dict: {'states', 'touch'} as ModbusDataHandler.read(), plus the filled 'touch_msg' and 'states_msg'.
+        """
+        touch_requests = [self.read_holding_registers(start, count) for start, count, offset in self.touch_plan.requests]
+        state_requests = [self.read_holding_registers(start, count) for start, count, offset in self.state_plan.requests]
+        responses = await asyncio.gather(*touch_requests, *state_requests)
+
+        touch_msg = get_inspire_hand_touch()
+        registers, missing = self.touch_plan.assemble(responses[:len(touch_requests)])
+        matrixs = decode_touch(self.register_map, registers, missing, touch_msg)
+
+        states_msg = get_inspire_hand_state()
+        registers, missing = self.state_plan.assemble(responses[len(touch_requests):])
+        decode_states(self.state_plan, self.states_structure, registers, missing, states_msg)
+
+        return {'states': get_states_dict(states_msg), 'touch': matrixs, 'touch_msg': touch_msg, 'states_msg': states_msg}
+
+    async def run(self, callback, frames_in_flight=2):
+        """_summary_
+        Acquire frames until stop() is called, keeping frames_in_flight frames outstanding so the next
+        frame's requests are already on the wire while the current one completes.
+        Args:
+            callback (callable): callback(frame) called in acquisition order with the result of read_frame().
+            frames_in_flight (int, optional): Number of overlapping frames. Defaults to 2.
+        """
+        self._running = True
+        pending = deque()
+        try:
+            while self._running:
+                while len(pending) < frames_in_flight:
+                    pending.append(asyncio.ensure_future(self.read_frame()))
+                callback(await pending.popleft())
+        finally:
+            for task in pending:
+                task.cancel()
+
+    def stop(self):
+        self._running = False
+
+    def _next_tid(self):
+        self._tid = (self._tid + 1) & 0xFFFF
+        return self._tid
+
+    async def _transaction(self, pdu, device_id=None):
+        device_id = self.device_id if device_id is None else device_id
+        async with self._in_flight:
+            tid = self._next_tid()
+            future = asyncio.get_running_loop().create_future()
+            self._pending[tid] = future
+            start = time.perf_counter()
+            self.writer.write(struct.pack('>HHHB', tid, 0, len(pdu) + 1, device_id) + pdu)
+            try:
+                response = await asyncio.wait_for(future, self.timeout)
+            except asyncio.TimeoutError:
+                print(f"Modbus request timeout, transaction id {tid}")
+                if self.stats is not None:
+                    self.stats.record(self.name, register_group(struct.unpack('>H', pdu[1:3])[0]), time.perf_counter() - start, len(pdu), 0, timeout=True)
+                return None
+            finally:
+                self._pending.pop(tid, None)
+        if self.stats is not None:
+            self.stats.record(self.name, register_group(struct.unpack('>H', pdu[1:3])[0]), time.perf_counter() - start, len(pdu), len(response),
+                              exception_code=response[1] if response[0] & 0x80 else None)
+        if response[0] & 0x80:
+            print(f"Error reading registers, exception code {response[1]}")
+            return None
+        return response
+
+    async def _receive_loop(self):
+        try:
+            while True:
+                header = await self.reader.readexactly(7)
+                tid, protocol_id, length, unit_id = struct.unpack('>HHHB', header)
+                pdu = await self.reader.readexactly(length - 1)
+                future = self._pending.get(tid)
+                if future is not None and not future.done():
+                    future.set_result(pdu)
+        except (asyncio.IncompleteReadError, ConnectionError) as e:
+            for future in self._pending.values():
+                if not future.done():
+                    future.set_exception(ModbusIOException(f"connection lost: {e}"))
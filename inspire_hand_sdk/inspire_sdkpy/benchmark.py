@@ -0,0 +1,251 @@
+from . import inspire_sdk, inspire_sdk_double
+from .inspire_dds import inspire_hand_touch, inspire_hand_state
+from unitree_sdk2py.core.channel import ChannelFactoryInitialize, ChannelSubscriber
+
+import numpy as np
+import argparse
+import json
+import os
+import platform
+import re
+import socket
+import subprocess
+import sys
+import threading
+import time
+
+scenarios = {
+    # 名称: (传输方式, 手的数量)
+    'tcp_single': ('tcp', 1),
+    'tcp_double': ('tcp', 2),
+    'rtu_single': ('rtu', 1),
+    'rtu_double': ('rtu', 2),
+}
+
+
+class StageTimer:
+    def __init__(self):
+        """Accumulates the time spent in wrapped callables during the current frame, per thread: the hands of
+        ModbusDataHandlerDouble run concurrently on executor threads and their times must not be summed."""
+        self.lock = threading.Lock()
+        self.elapsed = {}
+
+    def wrap(self, function):
+        def timed(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return function(*args, **kwargs)
+            finally:
+                elapsed = time.perf_counter() - start
+                thread = threading.get_ident()
+                with self.lock:
+                    self.elapsed[thread] = self.elapsed.get(thread, 0.0) + elapsed
+        return timed
+
+    def take(self):
+        """{thread ident: seconds} since the last take()."""
+        with self.lock:
+            elapsed, self.elapsed = self.elapsed, {}
+        return elapsed
+
+
+def percentiles(samples):
+    """p50/p90/p99/max of samples in seconds, returned in milliseconds."""
+    if not samples:
+        return None
+    values = np.asarray(samples) * 1000.0
+    return {
+        'p50': round(float(np.percentile(values, 50)), 4),
+        'p90': round(float(np.percentile(values, 90)), 4),
+        'p99': round(float(np.percentile(values, 99)), 4),
+        'max': round(float(values.max()), 4),
+    }
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def start_simulator(*args):
+    """Run `python -m inspire_sdkpy.simulator args` in a child process, returns (process, announced address)."""
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join(path for path in sys.path if path))
+    process = subprocess.Popen([sys.executable, '-u', '-m', 'inspire_sdkpy.simulator', *args],
+                               stdout=subprocess.PIPE, stderr=subprocess.STDOUT, text=True, env=env)
+    for line in process.stdout:
+        match = re.search(r'simulator on (\S+?),? ', line)
+        if match:
+            return process, match.group(1)
+    raise RuntimeError(f"simulator did not start: {process.wait()}")
+
+
+def attach_subscribers(hands):
+    """_summary_
+    Plain readers (no handler, nothing deserialized in this process) for every topic the driver publishes.
+    Publishers drop samples while unmatched (dropUnmatched), a matched reader makes publish_ms include serialization.
+    Returns:
+        list: the ChannelSubscriber, Close() them after the scenario
+    """
+    subscribers = []
+    for LR in ('r',) if hands == 1 else ('l', 'r'):
+        for topic, type in (("rt/inspire_hand/touch/"+LR, inspire_hand_touch), ("rt/inspire_hand/state/"+LR, inspire_hand_state)):
+            subscriber = ChannelSubscriber(topic, type)
+            subscriber.Init()
+            subscribers.append(subscriber)
+    return subscribers
+
+
+def wait_matched(handler, timeout=2.0):
+    """Wait until every publisher of the handler matched its benchmark subscriber."""
+    for attr in ('pub', 'pub2', 'state_pub', 'state_pub2'):
+        publisher = getattr(handler, attr, None)
+        if publisher is not None and not publisher.WaitMatched(timeout):
+            print(f"benchmark subscriber of {attr} did not match")
+
+
+def run_scenario(name, duration=5.0, baudrate=115200, latency=0.0, jitter=0.0, state_snapshot=False, serial_touch=True):
+    """_summary_
+    Start a simulated hand (or pair) in a child process, read it with ModbusDataHandler/ModbusDataHandlerDouble
+    for `duration` seconds and collect per frame stage times. Only the driver runs in this process, so
+    process CPU time per frame is the driver's cost. RTU scenarios read touch too (serial_touch) unless
+    serial_touch=False, so their fps compares with the TCP scenarios.
+    Returns:
+        dict: scenario result, times in milliseconds
+    """
+    transport, hands = scenarios[name]
+    simulator_args = ['--baudrate', str(baudrate), '--latency', str(latency), '--jitter', str(jitter), '--seed', '0']
+    processes = []
+    subscribers = attach_subscribers(hands)
+    try:
+        if transport == 'tcp':
+            port = free_port()
+            hosts = ['127.0.0.1', '127.0.0.2'][:hands]
+            for host in hosts:
+                processes.append(start_simulator('--tcp', str(port), '--host', host, *simulator_args)[0])
+            if hands == 1:
+                handler = inspire_sdk.ModbusDataHandler(ip=hosts[0], port=port, state_snapshot=state_snapshot, initDDS=False)
+            else:
+                handler = inspire_sdk_double.ModbusDataHandlerDouble(ip=hosts, port=port, state_snapshot=state_snapshot, initDDS=False)
+        else:
+            process, serial_port = start_simulator('--rtu', '--ids', *[str(i) for i in range(1, hands + 1)], *simulator_args)
+            processes.append(process)
+            if hands == 1:
+                handler = inspire_sdk.ModbusDataHandler(use_serial=True, serial_port=serial_port, baudrate=baudrate, state_snapshot=state_snapshot,
+                                                        serial_touch=serial_touch, initDDS=False)
+            else:
+                handler = inspire_sdk_double.ModbusDataHandlerDouble(use_serial=True, serial_port=serial_port, baudrate=baudrate, device_id=[1, 2],
+                                                                     state_snapshot=state_snapshot, serial_touch=serial_touch, initDDS=False)
+        wait_matched(handler)
+        return measure(name, handler, duration)
+    finally:
+        for subscriber in subscribers:
+            subscriber.Close()
+        for process in processes:
+            process.terminate()
+            process.wait()
+
+
+def measure(name, handler, duration):
+    """_summary_
+    Read frames for `duration` seconds and split every frame into I/O, decode and publish time. When the hands
+    of ModbusDataHandlerDouble are read concurrently (independent connections), the stages are those of the
+    slowest hand's thread, i.e. the wall-clock critical path of the frame, not the sum of both hands.
+    Returns:
+        dict: scenario result, times in milliseconds
+    """
+    module = inspire_sdk_double if hasattr(handler, 'clients') else inspire_sdk
+    decode_timer, publish_timer, hand_timer = StageTimer(), StageTimer(), StageTimer()
+    originals = {function: getattr(module, function) for function in ('decode_touch', 'decode_states')}
+    for function, original in originals.items():
+        setattr(module, function, decode_timer.wrap(original))
+    for attr in ('pub', 'pub2', 'state_pub', 'state_pub2'):
+        publisher = getattr(handler, attr, None)
+        if publisher is not None:
+            publisher.Write = publish_timer.wrap(publisher.Write)
+    if getattr(handler, 'concurrent', False):
+        handler.read_hand = hand_timer.wrap(handler.read_hand)
+
+    frame_times, io_times, decode_times, publish_times = [], [], [], []
+    try:
+        handler.read()    # 预热
+        decode_timer.take()
+        publish_timer.take()
+        hand_timer.take()
+        cpu_start = time.process_time()
+        start = time.perf_counter()
+        while time.perf_counter() - start < duration:
+            frame_start = time.perf_counter()
+            handler.read()
+            frame_time = time.perf_counter() - frame_start
+            decode, publish, hands = decode_timer.take(), publish_timer.take(), hand_timer.take()
+            # 两只手并发时取最慢的手所在线程 (关键路径), 否则所有阶段都在本线程
+            thread = max(hands, key=hands.get) if hands else threading.get_ident()
+            work = hands[thread] if hands else frame_time
+            decode, publish = decode.get(thread, 0.0), publish.get(thread, 0.0)
+            frame_times.append(frame_time)
+            decode_times.append(decode)
+            publish_times.append(publish)
+            io_times.append(work - decode - publish)   # Modbus I/O 及请求拼接
+        elapsed = time.perf_counter() - start
+        cpu = time.process_time() - cpu_start
+    finally:
+        for function, original in originals.items():
+            setattr(module, function, original)
+        handler.__dict__.pop('read_hand', None)
+        for client in dict.fromkeys(getattr(handler, 'clients', [handler.client])):
+            client.close()
+
+    frames = len(frame_times)
+    return {
+        'scenario': name,
+        'frames': frames,
+        'duration_s': round(elapsed, 3),
+        'fps': round(frames / elapsed, 2),
+        'frame_ms': percentiles(frame_times),
+        'io_ms': percentiles(io_times),
+        'decode_ms': percentiles(decode_times),
+        'publish_ms': percentiles(publish_times),
+        'cpu_ms_per_frame': round(cpu / frames * 1000.0, 4) if frames else None,
+    }
+
+
+def git_revision():
+    try:
+        return subprocess.check_output(['git', 'rev-parse', '--short', 'HEAD'], cwd=os.path.dirname(__file__),
+                                       stderr=subprocess.DEVNULL, text=True).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Inspire hand driver acquisition benchmark against the simulator")
+    parser.add_argument('--scenarios', nargs='+', default=list(scenarios), choices=list(scenarios))
+    parser.add_argument('--duration', type=float, default=5.0, help="seconds per scenario")
+    parser.add_argument('--baudrate', type=int, default=115200)
+    parser.add_argument('--latency', type=float, default=0.0, help="simulated hand processing time per request (s)")
+    parser.add_argument('--jitter', type=float, default=0.0)
+    parser.add_argument('--state-snapshot', action='store_true')
+    parser.add_argument('--no-serial-touch', dest='serial_touch', action='store_false', help="RTU scenarios read the states only")
+    parser.add_argument('--output', default=None, help="write the JSON result to this file instead of stdout")
+    args = parser.parse_args()
+
+    ChannelFactoryInitialize(0)
+    results = {
+        'revision': git_revision(),
+        'python': platform.python_version(),
+        'machine': platform.machine(),
+        'settings': {key: value for key, value in vars(args).items() if key not in ('scenarios', 'output')},
+        'results': [run_scenario(name, args.duration, args.baudrate, args.latency, args.jitter, args.state_snapshot, args.serial_touch)
+                    for name in args.scenarios],
+    }
+    text = json.dumps(results, indent=2)
+    if args.output is None:
+        print(text)
+    else:
+        with open(args.output, 'w') as f:
+            f.write(text + '\n')
+
+
+if __name__ == "__main__":
+    main()
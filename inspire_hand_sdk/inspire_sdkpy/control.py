@@ -0,0 +1,91 @@
+from .read_plan import REGISTER_STRIDE
+
+import threading
+
+# (模式位, ctrl 消息字段, 起始地址), 位置/角度/力控寄存器地址连续, 可合并为一次写入
+CTRL_BLOCKS = [
+    (0b0010, 'pos_set', 1474),     # 模式 2 - 位置
+    (0b0001, 'angle_set', 1486),   # 模式 1 - 角度
+    (0b0100, 'force_set', 1498),   # 模式 4 - 力控
+    (0b1000, 'speed_set', 1522),   # 模式 8 - 速度
+]
+
+
+def coalesce_writes(blocks):
+    """_summary_
+    Merge register blocks that are adjacent in the address space into single writes.
+    Args:
+        blocks (dict): start_address -> list of register values.
+    Returns:
+        list: (start_address, values) tuples in address order, one per Modbus write.
+    """
+    writes = []
+    for address in sorted(blocks):
+        values = blocks[address]
+        if writes and writes[-1][0] + len(writes[-1][1]) * REGISTER_STRIDE == address:
+            writes[-1][1].extend(values)
+        else:
+            writes.append((address, list(values)))
+    return writes
+
+
+class ControlMailbox:
+    def __init__(self):
+        """_summary_
+        Latest-wins pending command of one hand. Each ctrl message overwrites the register blocks selected by its
+        mode bits, so a burst of commands collapses into the newest one instead of being replayed in order.
+        Blocks not set by the newer message keep their pending value until written.
+        """
+        self._pending = {}
+        self._guard = threading.Lock()
+        self.submitted = 0    # 收到的 ctrl 消息数
+        self.superseded = 0   # 尚未写入就被新消息覆盖的寄存器块数
+        self.writes = 0       # 实际发出的 Modbus 写请求数
+
+    def submit(self, msg):
+        with self._guard:
+            for bit, attr, address in CTRL_BLOCKS:
+                if msg.mode & bit:
+                    if address in self._pending:
+                        self.superseded += 1
+                    self._pending[address] = list(getattr(msg, attr))
+            self.submitted += 1
+
+    def pending(self):
+        return bool(self._pending)
+
+    def take(self):
+        """Remove the pending command and return it as the minimum list of contiguous (start_address, values) writes."""
+        with self._guard:
+            pending, self._pending = self._pending, {}
+        return coalesce_writes(pending)
+
+    def flush_locked(self, write):
+        """_summary_
+        Write everything pending, the caller already holds the bus lock.
+        Args:
+            write (callable): write(start_address, values), e.g. lambda a, v: client.write_registers(a, v, device_id).
+        Returns:
+            int: number of writes issued
+        """
+        count = 0
+        while self._pending:
+            for address, values in self.take():
+                write(address, values)
+                count += 1
+        self.writes += count
+        return count
+
+    def flush(self, write, lock, blocking=False):
+        """_summary_
+        Write the pending command if the bus is free. When the bus is busy with a read, the reader writes it
+        before its next request (see flush_locked), so the command waits at most for one request in flight.
+        Returns:
+            int: number of writes issued
+        """
+        if not self._pending or not lock.acquire(blocking):
+            return 0
+        try:
+            return self.flush_locked(write)
+        finally:
+            lock.release()
@@ -0,0 +1,197 @@
+from .inspire_hand_defaut import baud_rates
+from .rtu import read_request, parse_read_response
+
+from pymodbus.client import ModbusTcpClient
+from concurrent.futures import ThreadPoolExecutor
+import argparse
+import serial
+import time
+
+HAND_ID_ADDRESS = 1000        # HAND_ID 寄存器, 探测时读取 1 个寄存器
+DEVICE_IDS = range(1, 100)    # 0 为广播地址, 不会应答
+BIT_PER_CHAR = 10             # 8N1: 起始位 + 8 数据位 + 停止位
+REQUEST_BYTES = 8             # 从站地址 + 功能码 + 地址 + 数量 + CRC
+RESPONSE_BYTES = 7            # 从站地址 + 功能码 + 字节数 + 1 个寄存器 + CRC
+
+
+class DiscoveredHand:
+    def __init__(self, transport, port, device_id, hand_id, baudrate=None, tcp_port=None, latency=None):
+        """_summary_
+        A hand that answered a discovery probe.
+        Args:
+            transport (str): 'rtu' or 'tcp'.
+            port (str): Serial port, or host for TCP.
+            device_id (int): Modbus unit id the hand answered on.
+            hand_id (int): Value of the HAND_ID register.
+            baudrate (int, optional): Serial baud rate. Defaults to None for TCP.
+            tcp_port (int, optional): TCP port. Defaults to None for RTU.
+            latency (float, optional): Probe round trip in seconds. Defaults to None.
+        """
+        self.transport = transport
+        self.port = port
+        self.device_id = device_id
+        self.hand_id = hand_id
+        self.baudrate = baudrate
+        self.tcp_port = tcp_port
+        self.latency = latency
+
+    def handler_kwargs(self):
+        """Connection arguments for ModbusDataHandler, e.g. ModbusDataHandler(**hand.handler_kwargs(), LR='r')."""
+        if self.transport == 'rtu':
+            return {'use_serial': True, 'serial_port': self.port, 'baudrate': self.baudrate, 'device_id': self.device_id}
+        return {'ip': self.port, 'port': self.tcp_port, 'device_id': self.device_id}
+
+    def __repr__(self):
+        where = f"{self.port}@{self.baudrate}" if self.transport == 'rtu' else f"{self.port}:{self.tcp_port}"
+        return f"DiscoveredHand({self.transport} {where}, id={self.device_id})"
+
+
+def frame_timeout(baudrate, margin=0.01):
+    """Response timeout of one probe: request and response time on the line at `baudrate` plus the hand's turnaround `margin` (s)."""
+    return (REQUEST_BYTES + RESPONSE_BYTES) * BIT_PER_CHAR / baudrate + margin
+
+
+def probe_rtu(link, device_id):
+    """_summary_
+    Read HAND_ID from `device_id` on an open serial port. The request is framed here rather than through
+    pymodbus, whose serial client closes and reopens the port after every unanswered request.
+    Args:
+        link (serial.Serial): Open port, its timeout bounds the wait for the response (see frame_timeout).
+        device_id (int): Unit id to probe.
+    Returns:
+        int: the HAND_ID register, or None when no valid response arrived
+    """
+    link.reset_input_buffer()
+    link.write(read_request(device_id, HAND_ID_ADDRESS, 1))
+    registers = parse_read_response(link.read(RESPONSE_BYTES), device_id, 1)
+    return None if registers is None else registers[0]
+
+
+def probe_tcp(client, device_id):
+    """Read HAND_ID from `device_id` with a pymodbus client, returns the register value or None when the hand did not answer."""
+    try:
+        response = client.read_holding_registers(HAND_ID_ADDRESS, 1, device_id)
+    except Exception:
+        return None
+    if response.isError():
+        return None
+    return response.registers[0]
+
+
+def scan_ids(probe, device_ids, max_devices=None, found=None, **hand_args):
+    """Call probe(device_id) for device_ids in order, stops once max_devices hands were found in total."""
+    found = [] if found is None else found
+    for device_id in device_ids:
+        if max_devices is not None and len(found) >= max_devices:
+            break
+        start = time.perf_counter()
+        hand_id = probe(device_id)
+        if hand_id is not None:
+            found.append(DiscoveredHand(device_id=device_id, hand_id=hand_id, latency=time.perf_counter() - start, **hand_args))
+    return found
+
+
+def scan_serial_port(port, baudrates=None, device_ids=DEVICE_IDS, max_devices=None, all_baudrates=False, margin=0.01):
+    """_summary_
+    Find the hands on one RS-485 port. Every baud rate opens the port once and probes all ids on that handle
+    with a timeout derived from the frame time, a silent id costs a few ms instead of a 1 s timeout.
+    Args:
+        port (str): Serial port, e.g. '/dev/ttyUSB0'.
+        baudrates (list, optional): Baud rates to try in order. Defaults to the REDU_RATIO rates, 115200 first.
+        device_ids (iterable, optional): Unit ids to probe. Defaults to 1..99.
+        max_devices (int, optional): Stop after this many hands. Defaults to None, probe every id.
+        all_baudrates (bool, optional): Keep trying the other baud rates after hands answered on one. Defaults to False,
+            the hands of one bus share its baud rate.
+        margin (float, optional): Hand turnaround time added to the frame time, see frame_timeout. Defaults to 0.01.
+    Returns:
+        list: DiscoveredHand of every hand found
+    """
+    baudrates = list(baud_rates.values()) if baudrates is None else baudrates
+    found = []
+    for baudrate in baudrates:
+        try:
+            link = serial.Serial(port, baudrate, timeout=frame_timeout(baudrate, margin))
+        except serial.SerialException as e:
+            print(f"无法打开串口: {port}: {e}")
+            return found
+        # 每个波特率只打开一次串口, 所有 id 复用同一个句柄
+        with link:
+            before = len(found)
+            scan_ids(lambda device_id: probe_rtu(link, device_id), device_ids, max_devices, found,
+                     transport='rtu', port=port, baudrate=baudrate)
+        if (max_devices is not None and len(found) >= max_devices) or (len(found) > before and not all_baudrates):
+            break
+    return found
+
+
+def scan_tcp_host(host, port=6000, device_ids=(1,), max_devices=None, timeout=0.2):
+    """_summary_
+    Find the hand(s) behind one Modbus TCP host, an unreachable host costs at most `timeout`.
+    Args:
+        host (str): IP address, e.g. '192.168.11.210'.
+        port (int, optional): Modbus TCP port. Defaults to 6000.
+        device_ids (iterable, optional): Unit ids to probe. Defaults to (1,).
+        max_devices (int, optional): Stop after this many hands. Defaults to None.
+        timeout (float, optional): Connect and response timeout in seconds. Defaults to 0.2.
+    Returns:
+        list: DiscoveredHand of every hand found
+    """
+    client = ModbusTcpClient(host, port=port, timeout=timeout, retries=0)
+    try:
+        if not client.connect():
+            return []
+        return scan_ids(lambda device_id: probe_tcp(client, device_id), device_ids, max_devices, transport='tcp', port=host, tcp_port=port)
+    finally:
+        client.close()
+
+
+def list_serial_ports():
+    """Serial ports present on this machine."""
+    from serial.tools import list_ports
+    return [port.device for port in list_ports.comports()]
+
+
+def discover(serial_ports=None, tcp_hosts=(), baudrates=None, device_ids=DEVICE_IDS, max_devices=None, all_baudrates=False,
+             margin=0.01, tcp_port=6000, tcp_device_ids=(1,), tcp_timeout=0.2):
+    """_summary_
+    Scan several serial ports and TCP hosts in parallel (one thread per port/host, ids of one bus are probed
+    in sequence since they share the line).
+    Args:
+        serial_ports (list, optional): Serial ports to scan. Defaults to None, every port of serial.tools.list_ports.
+        tcp_hosts (list, optional): Modbus TCP hosts to probe. Defaults to ().
+        max_devices (int, optional): Per port/host limit, see scan_serial_port. Defaults to None.
+        other arguments: see scan_serial_port and scan_tcp_host.
+    Returns:
+        list: DiscoveredHand of every hand found, in the order of the ports/hosts
+    """
+    ports = list_serial_ports() if serial_ports is None else list(serial_ports)
+    jobs = [(scan_serial_port, (port, baudrates, device_ids, max_devices, all_baudrates, margin)) for port in ports]
+    jobs += [(scan_tcp_host, (host, tcp_port, tcp_device_ids, max_devices, tcp_timeout)) for host in tcp_hosts]
+    if not jobs:
+        return []
+    with ThreadPoolExecutor(max_workers=len(jobs)) as executor:
+        futures = [executor.submit(function, *args) for function, args in jobs]
+        return [hand for future in futures for hand in future.result()]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Find Inspire hands on serial ports and Modbus TCP hosts")
+    parser.add_argument('--serial', nargs='*', default=None, help="serial ports, default all ports of this machine")
+    parser.add_argument('--tcp', nargs='*', default=[], help="Modbus TCP hosts")
+    parser.add_argument('--tcp-port', type=int, default=6000)
+    parser.add_argument('--baudrates', type=int, nargs='+', default=None, choices=sorted(baud_rates.values()))
+    parser.add_argument('--ids', type=int, nargs=2, default=[DEVICE_IDS.start, DEVICE_IDS.stop - 1], metavar=('FIRST', 'LAST'))
+    parser.add_argument('--max-devices', type=int, default=None)
+    parser.add_argument('--all-baudrates', action='store_true')
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    hands = discover(args.serial, args.tcp, args.baudrates, range(args.ids[0], args.ids[1] + 1), args.max_devices,
+                     args.all_baudrates, tcp_port=args.tcp_port)
+    for hand in hands:
+        print(hand, f"HAND_ID={hand.hand_id}", f"{hand.latency * 1000:.1f} ms")
+    print(f"找到 {len(hands)} 只手, 用时 {time.perf_counter() - start:.2f} s")
+
+
+if __name__ == "__main__":
+    main()
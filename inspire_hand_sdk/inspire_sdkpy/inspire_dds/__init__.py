@@ -8,8 +8,16 @@
 from ._inspire_hand_ctrl import inspire_hand_ctrl
 from ._inspire_hand_touch import inspire_hand_touch
 from ._inspire_hand_state import inspire_hand_state
+from ._inspire_frame_stamp import inspire_frame_stamp
+from ._inspire_hand_touch_stamped import inspire_hand_touch_stamped
+from ._inspire_hand_state_stamped import inspire_hand_state_stamped
+from ._inspire_hand_touch_flat import inspire_hand_touch_flat
 __all__ = [
 	"inspire_hand_ctrl",
 	"inspire_hand_touch",
 	"inspire_hand_state",
+	"inspire_frame_stamp",
+	"inspire_hand_touch_stamped",
+	"inspire_hand_state_stamped",
+	"inspire_hand_touch_flat",
 ]
@@ -0,0 +1,29 @@
+"""
+  Generated by Eclipse Cyclone DDS idlc Python Backend
+  Cyclone DDS IDL version: v0.11.0
+  Module: inspire
+  IDL file: inspire_hand_stamped.idl
+
+"""
+
+from dataclasses import dataclass
+from enum import auto
+from typing import TYPE_CHECKING, Optional
+
+import cyclonedds.idl as idl
+import cyclonedds.idl.annotations as annotate
+import cyclonedds.idl.types as types
+
+# root module import for resolving types
+# import inspire_dds
+
+
+@dataclass
+@annotate.final
+@annotate.autoid("sequential")
+class inspire_frame_stamp(idl.IdlStruct, typename="inspire.inspire_frame_stamp"):
+    seq: types.uint32
+    acq_start_ns: types.int64
+    acq_end_ns: types.int64
+
+
@@ -0,0 +1,30 @@
+"""
+  Generated by Eclipse Cyclone DDS idlc Python Backend
+  Cyclone DDS IDL version: v0.11.0
+  Module: inspire
+  IDL file: inspire_hand_touch_flat.idl
+
+"""
+
+from dataclasses import dataclass
+from enum import auto
+from typing import TYPE_CHECKING, Optional
+
+import cyclonedds.idl as idl
+import cyclonedds.idl.annotations as annotate
+import cyclonedds.idl.types as types
+
+# root module import for resolving types
+# import inspire_dds
+from ._inspire_frame_stamp import inspire_frame_stamp
+
+
+@dataclass
+@annotate.final
+@annotate.autoid("sequential")
+class inspire_hand_touch_flat(idl.IdlStruct, typename="inspire.inspire_hand_touch_flat"):
+    stamp: inspire_frame_stamp
+    valid: types.uint32
+    taxels: types.array[types.int16, 1062]
+
+
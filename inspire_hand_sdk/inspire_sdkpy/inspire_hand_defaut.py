@@ -1,8 +1,28 @@
 
 
 from .inspire_dds import inspire_hand_touch,inspire_hand_ctrl,inspire_hand_state
+from .inspire_dds import inspire_frame_stamp,inspire_hand_touch_stamped,inspire_hand_state_stamped,inspire_hand_touch_flat
 import threading
-modbus_lock = threading.Lock()
+modbus_lock = threading.Lock()  # 旧的进程级全局锁, 保留以兼容外部代码; 驱动内部使用 get_bus_lock
+
+# 每条物理总线/连接一把锁: TCP 按 ip:port, RTU 按串口, 同一串口上的多只手 (菊花链) 共用一把锁
+bus_locks = {}
+bus_locks_guard = threading.Lock()
+
+def get_bus_lock(bus):
+    """Return the lock shared by every handler on the bus/connection named `bus` (e.g. 'tcp://ip:port' or a serial port)."""
+    with bus_locks_guard:
+        if bus not in bus_locks:
+            bus_locks[bus] = threading.Lock()
+        return bus_locks[bus]
+
+# REDU_RATIO (1002) 寄存器值 -> RS-485 波特率
+baud_rates = {
+    0: 115200,
+    1: 57600,
+    2: 19200,
+    3: 921600
+}
 
 # 数据定义   
 data_sheet = [
@@ -97,6 +117,45 @@ def get_inspire_hand_state():
         temperature=[0 for _ in range(6)],        # 无名指指端触觉数据
     ) 
 
+def get_inspire_hand_touch_stamped(touch=None):
+    """Stamped touch message wrapping `touch` (e.g. the handler's reused touch_msg), a new one if None."""
+    return inspire_hand_touch_stamped(
+        stamp=inspire_frame_stamp(seq=0, acq_start_ns=0, acq_end_ns=0),
+        touch=get_inspire_hand_touch() if touch is None else touch
+    )
+
+def get_inspire_hand_state_stamped(state=None):
+    """Stamped state message wrapping `state` (e.g. the handler's reused states_msg), a new one if None."""
+    return inspire_hand_state_stamped(
+        stamp=inspire_frame_stamp(seq=0, acq_start_ns=0, acq_end_ns=0),
+        state=get_inspire_hand_state() if state is None else state
+    )
+
+TOUCH_TAXELS = 1062  # data_sheet 全部触觉点数, inspire_hand_touch_flat.taxels 的长度
+
+def get_inspire_hand_touch_flat():
+    return inspire_hand_touch_flat(
+        stamp=inspire_frame_stamp(seq=0, acq_start_ns=0, acq_end_ns=0),
+        valid=0,
+        taxels=[0 for _ in range(TOUCH_TAXELS)]
+    )
+
+def set_stamp(stamp, seq, acq_start_ns, acq_end_ns):
+    stamp.seq = seq
+    stamp.acq_start_ns = acq_start_ns
+    stamp.acq_end_ns = acq_end_ns
+
+def get_states_dict(states_msg):
+    return {
+        'POS_ACT': states_msg.pos_act,
+        'ANGLE_ACT': states_msg.angle_act,
+        'FORCE_ACT': states_msg.force_act,
+        'CURRENT': states_msg.current,
+        'ERROR': states_msg.err,
+        'STATUS': states_msg.status,
+        'TEMP': states_msg.temperature
+    }
+
 def get_inspire_hand_ctrl():
     return inspire_hand_ctrl(
         pos_set=[0 for _ in range(6)],        # 小拇指指端触觉数据
@@ -1,24 +1,33 @@
 
 from .inspire_hand_defaut import *
 from .inspire_dds import inspire_hand_touch,inspire_hand_ctrl,inspire_hand_state
+from .inspire_dds import inspire_hand_touch_stamped,inspire_hand_state_stamped,inspire_hand_touch_flat
+from .read_plan import compile_read_plan
+from .register_map import get_register_map
+from .register_decode import decode_registers, decode_touch, decode_states, encode_touch_flat
+from .control import ControlMailbox
+from .modbus_stats import DiagnosticsPublisher
+from .timeseries import TimeSeriesRing, state_groups
+from .shm_ring import ShmFrameWriter
+from .touch_cycle import TouchCycle
 from unitree_sdk2py.core.channel import ChannelPublisher, ChannelFactoryInitialize
 from unitree_sdk2py.core.channel import ChannelSubscriber, ChannelFactoryInitialize
+from unitree_sdk2py.core.channel_qos import ChannelQosPreset
 from unitree_sdk2py.utils.thread import Thread
 
 from pymodbus.client import ModbusTcpClient
 from pymodbus.client import ModbusSerialClient
 
 import numpy as np
-import struct
 import sys
 import time
 class ModbusDataHandler:
-    def __init__(self, data=data_sheet, history_length=100, network=None, ip=None, port=6000, device_id=1, LR='r', use_serial=False, serial_port='/dev/ttyUSB0', baudrate=115200, states_structure=None, initDDS=True, max_retries=5, retry_delay=2):
+    def __init__(self, data=data_sheet, history_length=100, network=None, ip=None, port=6000, device_id=1, LR='r', use_serial=False, serial_port='/dev/ttyUSB0', baudrate=115200, states_structure=None, state_snapshot=False, bus=None, stats=None, diagnostics_period=1.0, stamped=False, flat_touch=False, shm=False, shm_slots=16, serial_touch=False, touch_divisors=None, initDDS=True, max_retries=5, retry_delay=2):
         """_summary_
         Calling self.read() in a loop reads and returns the data, and publishes the DDS message at the same time        
         Args:
             data (dict, optional): Tactile sensor register definition. Defaults to data_sheet.
-            history_length (int, optional): Hand state history_length. Defaults to 100.
+            history_length (int, optional): Hand state samples kept in self.history (TimeSeriesRing). Defaults to 100.
             network (str, optional): Name of the DDS NIC. Defaults to None.
             ip (str, optional): ModbusTcp IP. Defaults to None will use 192.1686.11.210.
             port (int, optional): ModbusTcp IP port. Defaults to 6000.
@@ -28,6 +37,16 @@ class ModbusDataHandler:
             serial_port (str, optional): Serial port name. Defaults to '/dev/ttyUSB0'.
             baudrate (int, optional): Serial baud rate. Defaults to 115200.
             states_structure (list, optional): List of tuples for state registers. Each tuple should contain (attribute_name, start_address, length, data_type). If None ,will publish All Data 
+            state_snapshot (bool, optional): Read all state registers in one request spanning the states_structure, so every field comes from the same instant. Defaults to False, only contiguous fields are merged.
+            bus (str, optional): Name of the physical bus, handlers with the same name share one lock. Defaults to None, the serial port for RTU (hands daisy-chained on one port share it) or 'tcp://ip:port'.
+            stats (ModbusStats, optional): Record every Modbus transaction and publish the stats on rt/inspire_hand/diagnostics/LR. Defaults to None, disabled.
+            diagnostics_period (float, optional): Period of the diagnostics message in seconds. Defaults to 1.0.
+            stamped (bool, optional): Publish inspire_hand_touch_stamped/inspire_hand_state_stamped (sequence number and monotonic acquisition times) on rt/inspire_hand/touch_stamped/LR and rt/inspire_hand/state_stamped/LR instead of the plain topics. Defaults to False.
+            flat_touch (bool, optional): Publish the tactile frame as inspire_hand_touch_flat (all 1062 taxels in one int16 array, region-valid bitmask and stamp) on rt/inspire_hand/touch_flat/LR instead of the per-region touch message. Defaults to False.
+            shm (bool, optional): Also write every frame into the shared memory ring 'inspire_hand_'+LR for consumers on this host (ShmFrameReader), DDS stays available for remote ones. Defaults to False.
+            shm_slots (int, optional): Frames kept in the shared memory ring. Defaults to 16.
+            serial_touch (bool, optional): Also read and publish the tactile data in serial mode (chunks of up to 125 registers, use baudrate=921600). Defaults to False, serial mode reads the states only.
+            touch_divisors (dict, optional): Read each tactile region only every N-th frame, e.g. SERIAL_TOUCH_DIVISORS or {'tip': 1, 'palm': 4}, see TouchCycle. Regions not read keep their last values. Defaults to None, every region each frame.
             initDDS (bool, optional): Run ChannelFactoryInitialize(0),only need run once in all program
             max_retries (int, optional): Number of retries for connecting to Modbus server. Defaults to 3.
             retry_delay (int, optional): Delay between retries in seconds. Defaults to 2.
@@ -36,16 +55,17 @@ class ModbusDataHandler:
         """        
         self.data = data
         self.history_length = history_length
-        self.history = {
-            'POS_ACT': [np.zeros(history_length) for _ in range(6)],
-            'ANGLE_ACT': [np.zeros(history_length) for _ in range(6)],
-            'FORCE_ACT': [np.zeros(history_length) for _ in range(6)],
-            'CURRENT': [np.zeros(history_length) for _ in range(6)],
-            'ERROR': [np.zeros(history_length) for _ in range(6)],
-            'STATUS': [np.zeros(history_length) for _ in range(6)],
-            'TEMP': [np.zeros(history_length) for _ in range(6)]
-        }
+        # 状态历史 (7 类 x 6 自由度), 每帧写入一次, 绘图和分析直接读取有序视图
+        self.history = TimeSeriesRing(state_groups, history_length)
         self.use_serial = use_serial
+        self.LR = LR
+        self.stats = stats
+        if self.stats is not None:
+            self.stats.add_device(LR, 'rtu' if use_serial else 'tcp')
+        # 将 17 个触觉区域合并为尽量少的 Modbus 读请求
+        # 编译一次的触觉寄存器表: 区域偏移/形状/读取计划, 与 GUI 及记录脚本共用
+        self.register_map = get_register_map(self.data)
+        self.touch_plan = self.register_map.plan
         
         self.states_structure = states_structure or [
             ('pos_act', 1534, 6, 'short'),
@@ -56,6 +76,30 @@ class ModbusDataHandler:
             ('status', 1612, 3, 'byte'),
             ('temperature', 1618, 3, 'byte')
         ]
+        self.state_snapshot = state_snapshot
+        # 快照模式: 状态寄存器 (1534-1623) 合并为一次读取; 否则只合并地址连续的字段
+        self.state_plan = compile_read_plan([(attr_name, start_address, length) for attr_name, start_address, length, data_type in self.states_structure],
+                                            max_gap=None if state_snapshot else 0)
+        # 复用的 DDS 消息和寄存器缓冲区, 每帧原地填充, 避免重新分配
+        self.touch_msg = get_inspire_hand_touch()
+        self.states_msg = get_inspire_hand_state()
+        # 带帧序号和采集时间的消息, 包装同一个 touch_msg/states_msg
+        self.stamped = stamped
+        self.seq = 0
+        self.touch_stamped = get_inspire_hand_touch_stamped(self.touch_msg)
+        self.states_stamped = get_inspire_hand_state_stamped(self.states_msg)
+        # 扁平触觉帧: 按 data 顺序的全部触觉点
+        self.flat_touch = flat_touch
+        self.touch_flat = get_inspire_hand_touch_flat()
+        self.touch_buffer = np.zeros(self.touch_plan.num_registers, dtype=np.uint16)
+        # 串口模式默认不读触觉; serial_touch=True 时按最大块读取
+        self.read_touch = not use_serial or serial_touch
+        # 按区域分频读取: 每个相位的读取计划编译一次, 未读区域保留上一次的值
+        self.touch_cycle = TouchCycle(self.register_map, touch_divisors) if touch_divisors else None
+        self.touch_latest = {}
+        # 同一台机器的消费者通过共享内存读取, 无需 DDS 序列化
+        self.shm = ShmFrameWriter("inspire_hand_"+LR, self.register_map, shm_slots) if shm else None
+        self.state_buffer = np.zeros(self.state_plan.num_registers, dtype=np.uint16)
         if self.use_serial:
             self.client = ModbusSerialClient(method='rtu', port=serial_port, baudrate=baudrate, timeout=1)
             print("will use serial")
@@ -67,6 +111,12 @@ class ModbusDataHandler:
                 self.client = ModbusTcpClient(ip, port=port)
                 print("will use Tcp")
 
+        if bus is None:
+            bus = serial_port if self.use_serial else f"tcp://{defaut_ip if ip is None else ip}:{6000 if ip is None else port}"
+        self.lock = get_bus_lock(bus)
+        # 控制指令只保留最新一条, 在下一次读请求之前写入
+        self.control = ControlMailbox()
+
         # 尝试连接 Modbus 服务器，带重试机制
         self.connect_to_modbus(max_retries, retry_delay)
         self.device_id = device_id
@@ -84,12 +134,23 @@ class ModbusDataHandler:
             # 这里可以添加日志记录或其他恢复机制
             return
         
-        self.client.write_register(1004,1,self.device_id) #reser error
-        if not self.use_serial:
-            self.pub = ChannelPublisher("rt/inspire_hand/touch/"+LR, inspire_hand_touch)
+        with self.lock:
+            self.client.write_register(1004,1,self.device_id) #reser error
+        if self.stats is not None:
+            self.diagnostics = DiagnosticsPublisher(self.stats, "rt/inspire_hand/diagnostics/"+LR, diagnostics_period).start()
+        if self.read_touch:
+            if flat_touch:
+                self.pub = ChannelPublisher("rt/inspire_hand/touch_flat/"+LR, inspire_hand_touch_flat, ChannelQosPreset.SENSOR_STREAM, dropUnmatched=True)
+            elif stamped:
+                self.pub = ChannelPublisher("rt/inspire_hand/touch_stamped/"+LR, inspire_hand_touch_stamped, ChannelQosPreset.SENSOR_STREAM, dropUnmatched=True)
+            else:
+                self.pub = ChannelPublisher("rt/inspire_hand/touch/"+LR, inspire_hand_touch, ChannelQosPreset.SENSOR_STREAM, dropUnmatched=True)
             self.pub.Init()
 
-        self.state_pub = ChannelPublisher("rt/inspire_hand/state/"+LR, inspire_hand_state)
+        if stamped:
+            self.state_pub = ChannelPublisher("rt/inspire_hand/state_stamped/"+LR, inspire_hand_state_stamped)
+        else:
+            self.state_pub = ChannelPublisher("rt/inspire_hand/state/"+LR, inspire_hand_state)
         self.state_pub.Init()
             
         self.sub = ChannelSubscriber("rt/inspire_hand/ctrl/"+LR, inspire_hand_ctrl)
@@ -107,6 +168,8 @@ class ModbusDataHandler:
             except ConnectionError as e:
                 print(f"Connection attempt {retries + 1} failed: {e}")
                 retries += 1
+                if self.stats is not None:
+                    self.stats.record_retry(self.LR)
                 if retries < max_retries:
                     print(f"Retrying in {retry_delay} seconds...")
                     time.sleep(retry_delay)
@@ -114,77 +177,82 @@ class ModbusDataHandler:
                     print("Max retries reached. Could not connect.")
                     raise   
     def write_registers_callback(self,msg:inspire_hand_ctrl):
-        with modbus_lock:
-            if msg.mode & 0b0001:  # 模式 1 - 角度
-                self.client.write_registers(1486, msg.angle_set, self.device_id)
-                # print('angle_set')
-            if msg.mode & 0b0010:  # 模式 2 - 位置
-                self.client.write_registers(1474, msg.pos_set, self.device_id)
-                # print('pos_set')
+        self.control.submit(msg)
+        self.control.flush(self.write_registers, self.lock)
 
-            if msg.mode & 0b0100:  # 模式 4 - 力控
-                self.client.write_registers(1498, msg.force_set, self.device_id)
-                # print('force_set')
+    def write_registers(self, start_address, values):
+        if self.stats is None:
+            self.client.write_registers(start_address, values, self.device_id)
+        else:
+            self.stats.transaction(self.LR, start_address, len(values), self.client.write_registers, start_address, values, self.device_id, write=True)
 
-            if msg.mode & 0b1000:  # 模式 8 - 速度
-                self.client.write_registers(1522, msg.speed_set, self.device_id)
-                
     def read(self):
-        if not self.use_serial:
-            touch_msg = get_inspire_hand_touch()
-            matrixs = {}
-            for i, (name, addr, length, size, var) in enumerate(self.data):
-                value = self.read_and_parse_registers(addr, length // 2,'short')
-                if value is not None:
-                    setattr(touch_msg, var, value)
-                    matrix = np.array(value).reshape(size)
-                    matrixs[var]=matrix
-            self.pub.Write(touch_msg)
+        self.seq = (self.seq + 1) & 0xFFFFFFFF
+        frame_start_ns = time.monotonic_ns()
+        registers, missing = None, ()
+        if self.read_touch:
+            start_ns = frame_start_ns
+            if self.touch_cycle is None:
+                registers, missing = self.touch_plan.execute(self.read_registers, self.touch_buffer)
+            else:
+                # 帧序号从 1 开始: 第一帧为相位 0, 读取全部区域
+                phase = self.touch_cycle.phase(self.seq - 1)
+                registers, missing = phase.plan.execute(self.read_registers, phase.buffer())
+                registers, missing = phase.scatter(registers, missing, self.touch_buffer)
+            end_ns = time.monotonic_ns()
+            if self.flat_touch:
+                set_stamp(self.touch_flat.stamp, self.seq, start_ns, end_ns)
+                matrixs = encode_touch_flat(self.register_map, registers, missing, self.touch_flat)
+                self.pub.Write(self.touch_flat)
+            else:
+                set_stamp(self.touch_stamped.stamp, self.seq, start_ns, end_ns)
+                matrixs = decode_touch(self.register_map, registers, missing, self.touch_msg)
+                self.pub.Write(self.touch_stamped if self.stamped else self.touch_msg)
+            if self.touch_cycle is not None:
+                # 返回所有区域的最新值, 而不只是本帧读取的区域
+                self.touch_latest.update(matrixs)
+                matrixs = dict(self.touch_latest)
         else:
             matrixs = {}
         # Read the states for POS_ACT, ANGLE_ACT, etc.
-        states_msg = get_inspire_hand_state()
+        start_ns = time.monotonic_ns()
+        self.read_states(self.states_msg)
+        end_ns = time.monotonic_ns()
+        set_stamp(self.states_stamped.stamp, self.seq, start_ns, end_ns)
 
-        for attr_name, start_address, length, data_type in self.states_structure:
-            setattr(states_msg, attr_name, self.read_and_parse_registers(start_address, length, data_type))
-            
-        self.state_pub.Write(states_msg)
+        self.state_pub.Write(self.states_stamped if self.stamped else self.states_msg)
+        if self.shm is not None:
+            valid = 0 if registers is None else self.register_map.valid_mask(missing)
+            self.shm.write(self.seq, frame_start_ns, end_ns, registers, valid, self.states_msg)
 
-        return {'states':{
-            'POS_ACT': states_msg.pos_act,
-            'ANGLE_ACT': states_msg.angle_act,
-            'FORCE_ACT': states_msg.force_act,
-            'CURRENT': states_msg.current,
-            'ERROR': states_msg.err,
-            'STATUS': states_msg.status,
-            'TEMP': states_msg.temperature
-        },'touch':matrixs
-                }
+        states = get_states_dict(self.states_msg)
+        self.history.append(states)
+        return {'states':states,'touch':matrixs}
 
-    def read_and_parse_registers(self, start_address, num_registers, data_type='short'):
-         with modbus_lock:
-            # 读取寄存器
-            response = self.client.read_holding_registers(start_address, num_registers, self.device_id)
+    def read_states(self, states_msg):
+        registers, missing = self.state_plan.execute(self.read_registers, self.state_buffer)
+        return decode_states(self.state_plan, self.states_structure, registers, missing, states_msg)
 
-            if not response.isError():
-                if data_type == 'short':
-                    # 将读取的寄存器打包为二进制数据
-                    packed_data = struct.pack('>' + 'H' * num_registers, *response.registers)
-                    # 将寄存器解包为带符号的 16 位整数 (short)
-                    angles = struct.unpack('>' + 'h' * num_registers, packed_data)
-                    return angles
-                elif data_type == 'byte':
-                    # 将每个 16 位寄存器拆分为两个 8 位 (uint8) 数据
-                    byte_list = []
-                    for reg in response.registers:
-                        high_byte = (reg >> 8) & 0xFF  # 高 8 位
-                        low_byte = reg & 0xFF          # 低 8 位
-                        byte_list.append(high_byte)
-                        byte_list.append(low_byte)
-                    return byte_list
+    def read_registers(self, start_address, num_registers):
+        with self.lock:
+            # 待发送的控制指令优先于读请求
+            self.control.flush_locked(self.write_registers)
+            # 读取寄存器
+            if self.stats is None:
+                response = self.client.read_holding_registers(start_address, num_registers, self.device_id)
             else:
-                print("Error reading registers")
-                return None
+                response = self.stats.transaction(self.LR, start_address, num_registers, self.client.read_holding_registers,
+                                                  start_address, num_registers, self.device_id)
+        if response.isError():
+            print(f"Error reading registers {start_address}+{num_registers}: {response}")
+            return None
+        return response.registers
+
+    def read_and_parse_registers(self, start_address, num_registers, data_type='short'):
+        registers = self.read_registers(start_address, num_registers)
+        if registers is None:
+            return None
+        return decode_registers(registers, data_type)
             
 
 if __name__ == "__main__":
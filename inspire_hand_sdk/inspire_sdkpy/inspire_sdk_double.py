@@ -1,34 +1,53 @@
 
 from .inspire_hand_defaut import *
 from .inspire_dds import inspire_hand_touch,inspire_hand_ctrl,inspire_hand_state
+from .inspire_dds import inspire_hand_touch_stamped,inspire_hand_state_stamped,inspire_hand_touch_flat
+from .read_plan import compile_read_plan
+from .register_map import get_register_map
+from .register_decode import decode_registers, decode_touch, decode_states, encode_touch_flat
+from .control import ControlMailbox
+from .modbus_stats import DiagnosticsPublisher
+from .timeseries import TimeSeriesRing, state_groups
+from .shm_ring import ShmFrameWriter
+from .touch_cycle import TouchCycle
 from unitree_sdk2py.core.channel import ChannelPublisher, ChannelFactoryInitialize
 from unitree_sdk2py.core.channel import ChannelSubscriber, ChannelFactoryInitialize
+from unitree_sdk2py.core.channel_qos import ChannelQosPreset
 from unitree_sdk2py.utils.thread import Thread
 
 from pymodbus.client import ModbusTcpClient
 from pymodbus.client import ModbusSerialClient
 
+from concurrent.futures import ThreadPoolExecutor
 import numpy as np
-import struct
 import sys
 import time
  
 class ModbusDataHandlerDouble:
-    def __init__(self, data=data_sheet, history_length=100, network=None, ip=None, port=6000, device_id=[1,2], use_serial=False, serial_port='/dev/ttyUSB0', baudrate=115200, states_structure=None, initDDS=True, max_retries=5, retry_delay=2):
+    def __init__(self, data=data_sheet, history_length=100, network=None, ip=None, port=6000, device_id=[1,2], use_serial=False, serial_port='/dev/ttyUSB0', baudrate=115200, states_structure=None, state_snapshot=False, bus=None, stats=None, diagnostics_period=1.0, stamped=False, flat_touch=False, shm=False, shm_slots=16, serial_touch=False, touch_divisors=None, initDDS=True, max_retries=5, retry_delay=2):
         """_summary_
         Calling self.read() in a loop reads and returns the data, and publishes the DDS message at the same time        
         Args:
             data (dict, optional): Tactile sensor register definition. Defaults to data_sheet.
-            history_length (int, optional): Hand state history_length. Defaults to 100.
+            history_length (int, optional): Hand state samples kept in self.histories (TimeSeriesRing per hand). Defaults to 100.
             network (str, optional): Name of the DDS NIC. Defaults to None.
-            ip (str, optional): ModbusTcp IP. Defaults to None will use 192.1686.11.210.
+            ip (str | list, optional): ModbusTcp IP, or [ip_l, ip_r] to poll both hands concurrently on independent connections. Defaults to None will use 192.1686.11.210.
             port (int, optional): ModbusTcp IP port. Defaults to 6000.
-            device_id (int, optional): Hand ID. Defaults to 1.
-            LR (str, optional): Topic suffix l or r. Defaults to 'r'.
+            device_id (list, optional): Hand IDs [l, r]. Defaults to [1, 2].
             use_serial (bool, optional): Whether to use serial mode. Defaults to False.
             serial_port (str, optional): Serial port name. Defaults to '/dev/ttyUSB0'.
             baudrate (int, optional): Serial baud rate. Defaults to 115200.
             states_structure (list, optional): List of tuples for state registers. Each tuple should contain (attribute_name, start_address, length, data_type). If None ,will publish All Data
+            state_snapshot (bool, optional): Read all state registers in one request spanning the states_structure, so every field comes from the same instant. Defaults to False, only contiguous fields are merged.
+            bus (str, optional): Name of the physical bus, handlers with the same name share one lock. Defaults to None, the serial port for RTU (hands daisy-chained on one port share it) or 'tcp://ip:port'.
+            stats (ModbusStats, optional): Record every Modbus transaction per hand ('l', 'r') and publish the stats on rt/inspire_hand/diagnostics. Defaults to None, disabled.
+            diagnostics_period (float, optional): Period of the diagnostics message in seconds. Defaults to 1.0.
+            stamped (bool, optional): Publish inspire_hand_touch_stamped/inspire_hand_state_stamped (per hand sequence number and monotonic acquisition times) on rt/inspire_hand/touch_stamped/{l,r} and rt/inspire_hand/state_stamped/{l,r} instead of the plain topics. Defaults to False.
+            flat_touch (bool, optional): Publish the tactile frames as inspire_hand_touch_flat (all 1062 taxels in one int16 array, region-valid bitmask and stamp) on rt/inspire_hand/touch_flat/{l,r} instead of the per-region touch message. Defaults to False.
+            shm (bool, optional): Also write every frame into the shared memory rings 'inspire_hand_l' and 'inspire_hand_r' for consumers on this host (ShmFrameReader), DDS stays available for remote ones. Defaults to False.
+            shm_slots (int, optional): Frames kept in each shared memory ring. Defaults to 16.
+            serial_touch (bool, optional): Also read and publish the tactile data in serial mode (chunks of up to 125 registers, use baudrate=921600). Defaults to False, serial mode reads the states only.
+            touch_divisors (dict, optional): Read each tactile region only every N-th frame on both hands, e.g. SERIAL_TOUCH_DIVISORS or {'tip': 1, 'palm': 4}, see TouchCycle. Regions not read keep their last values. Defaults to None, every region each frame.
             initDDS (bool, optional): Run ChannelFactoryInitialize(0),only need run once in all program
             max_retries (int, optional): Number of retries for connecting to Modbus server. Defaults to 3.
             retry_delay (int, optional): Delay between retries in seconds. Defaults to 2.
@@ -37,16 +56,19 @@ class ModbusDataHandlerDouble:
         """        
         self.data = data
         self.history_length = history_length
-        self.history = {
-            'POS_ACT': [np.zeros(history_length) for _ in range(6)],
-            'ANGLE_ACT': [np.zeros(history_length) for _ in range(6)],
-            'FORCE_ACT': [np.zeros(history_length) for _ in range(6)],
-            'CURRENT': [np.zeros(history_length) for _ in range(6)],
-            'ERROR': [np.zeros(history_length) for _ in range(6)],
-            'STATUS': [np.zeros(history_length) for _ in range(6)],
-            'TEMP': [np.zeros(history_length) for _ in range(6)]
-        }
+        # 每只手的状态历史 (7 类 x 6 自由度), self.history 为左手, 与 self.client 相同
+        self.histories = [TimeSeriesRing(state_groups, history_length), TimeSeriesRing(state_groups, history_length)]
+        self.history = self.histories[0]
         self.use_serial = use_serial
+        self.stats = stats
+        self.hand_names = ['l', 'r']
+        if self.stats is not None:
+            for name in self.hand_names:
+                self.stats.add_device(name, 'rtu' if use_serial else 'tcp')
+        # 将 17 个触觉区域合并为尽量少的 Modbus 读请求
+        # 编译一次的触觉寄存器表: 区域偏移/形状/读取计划, 与 GUI 及记录脚本共用
+        self.register_map = get_register_map(self.data)
+        self.touch_plan = self.register_map.plan
         
         self.states_structure = states_structure or [
             ('pos_act', 1534, 6, 'short'),
@@ -57,16 +79,58 @@ class ModbusDataHandlerDouble:
             ('status', 1612, 3, 'byte'),
             ('temperature', 1618, 3, 'byte')
         ]
+        self.state_snapshot = state_snapshot
+        # 快照模式: 状态寄存器 (1534-1623) 合并为一次读取; 否则只合并地址连续的字段
+        self.state_plan = compile_read_plan([(attr_name, start_address, length) for attr_name, start_address, length, data_type in self.states_structure],
+                                            max_gap=None if state_snapshot else 0)
+        # 每只手复用的 DDS 消息和寄存器缓冲区, 每帧原地填充, 避免重新分配
+        self.touch_msgs = [get_inspire_hand_touch(), get_inspire_hand_touch()]
+        self.states_msgs = [get_inspire_hand_state(), get_inspire_hand_state()]
+        # 带帧序号和采集时间的消息, 包装同一个 touch_msg/states_msg
+        self.stamped = stamped
+        self.seqs = [0, 0]
+        self.touch_stampeds = [get_inspire_hand_touch_stamped(msg) for msg in self.touch_msgs]
+        self.states_stampeds = [get_inspire_hand_state_stamped(msg) for msg in self.states_msgs]
+        # 扁平触觉帧: 按 data 顺序的全部触觉点
+        self.flat_touch = flat_touch
+        self.touch_flats = [get_inspire_hand_touch_flat(), get_inspire_hand_touch_flat()]
+        self.touch_buffers = [np.zeros(self.touch_plan.num_registers, dtype=np.uint16) for _ in range(2)]
+        # 串口模式默认不读触觉; serial_touch=True 时按最大块读取
+        self.read_touch = not use_serial or serial_touch
+        # 按区域分频读取: 每个相位的读取计划编译一次, 未读区域保留上一次的值
+        self.touch_cycle = TouchCycle(self.register_map, touch_divisors) if touch_divisors else None
+        self.touch_latests = [{}, {}]
+        # 同一台机器的消费者通过共享内存读取, 无需 DDS 序列化
+        self.shms = [ShmFrameWriter("inspire_hand_"+LR, self.register_map, shm_slots) for LR in ('l', 'r')] if shm else None
+        self.state_buffers = [np.zeros(self.state_plan.num_registers, dtype=np.uint16) for _ in range(2)]
         if self.use_serial:
-            self.client = ModbusSerialClient(method='rtu', port=serial_port, baudrate=baudrate, timeout=1)
+            self.clients = [ModbusSerialClient(method='rtu', port=serial_port, baudrate=baudrate, timeout=1)]
+            buses = [serial_port]
         else:
             if ip==None:
-                self.client = ModbusTcpClient(defaut_ip, port=6000)
+                ips, port = [defaut_ip], 6000
+            elif isinstance(ip, (list, tuple)):
+                ips = list(ip)
             else:
-                self.client = ModbusTcpClient(ip, port=port)
-                
+                ips = [ip]
+            self.clients = [ModbusTcpClient(hand_ip, port=port) for hand_ip in ips]
+            buses = [f"tcp://{hand_ip}:{port}" for hand_ip in ips]
+        if bus is not None:
+            buses = [bus] * len(self.clients)
+        # 每只手对应的连接和总线锁, 两只手在同一连接上时共用
+        self.clients = [self.clients[0], self.clients[-1]]
+        self.locks = [get_bus_lock(buses[0]), get_bus_lock(buses[-1])]
+        self.client = self.clients[0]
+        self.lock = self.locks[0]
+        # 两只手在独立的连接上时并发读取, 否则在同一总线上交替发送请求
+        self.concurrent = self.locks[0] is not self.locks[1]
+        self.executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix="inspire_hand") if self.concurrent else None
+        # 每只手的控制指令只保留最新一条, 在该总线的下一次读请求之前写入
+        self.controls = [ControlMailbox(), ControlMailbox()]
+
         # 尝试连接 Modbus 服务器，带重试机制
-        self.connect_to_modbus(max_retries, retry_delay)     
+        for client in dict.fromkeys(self.clients):
+            self.connect_to_modbus(max_retries, retry_delay, client)
         self.device_id = device_id
        # 初始化 ChannelFactory
         try:
@@ -81,152 +145,204 @@ class ModbusDataHandlerDouble:
             # 这里可以添加日志记录或其他恢复机制
             return
         
-        self.client.write_register(1004,1,self.device_id[0]) #reser error
-        self.client.write_register(1004,1,self.device_id[1]) #reser error
+        for hand in (0, 1):
+            with self.locks[hand]:
+                self.clients[hand].write_register(1004,1,self.device_id[hand]) #reser error
+        if self.stats is not None:
+            self.diagnostics = DiagnosticsPublisher(self.stats, "rt/inspire_hand/diagnostics", diagnostics_period).start()
 
-        if not self.use_serial:
-            self.pub = ChannelPublisher("rt/inspire_hand/touch/l", inspire_hand_touch)
+        touch_topic, state_topic = ("touch_stamped", "state_stamped") if stamped else ("touch", "state")
+        touch_type, state_type = (inspire_hand_touch_stamped, inspire_hand_state_stamped) if stamped else (inspire_hand_touch, inspire_hand_state)
+        if flat_touch:
+            touch_topic, touch_type = "touch_flat", inspire_hand_touch_flat
+        if self.read_touch:
+            self.pub = ChannelPublisher("rt/inspire_hand/"+touch_topic+"/l", touch_type, ChannelQosPreset.SENSOR_STREAM, dropUnmatched=True)
             self.pub.Init()
 
-            self.pub2 = ChannelPublisher("rt/inspire_hand/touch/r", inspire_hand_touch)
+            self.pub2 = ChannelPublisher("rt/inspire_hand/"+touch_topic+"/r", touch_type, ChannelQosPreset.SENSOR_STREAM, dropUnmatched=True)
             self.pub2.Init()
 
-        self.state_pub = ChannelPublisher("rt/inspire_hand/state/l", inspire_hand_state)
+        self.state_pub = ChannelPublisher("rt/inspire_hand/"+state_topic+"/l", state_type)
         self.state_pub.Init()
         
-        self.state_pub2 = ChannelPublisher("rt/inspire_hand/state/r", inspire_hand_state)
+        self.state_pub2 = ChannelPublisher("rt/inspire_hand/"+state_topic+"/r", state_type)
         self.state_pub2.Init()  
          
         self.sub = ChannelSubscriber("rt/inspire_hand/ctrl/l", inspire_hand_ctrl)
-        self.sub.Init(self.write_registers_callback, 10)
+        self.sub.Init(lambda msg: self.write_registers_callback(msg, 0), 10)
         
-        self.sub = ChannelSubscriber("rt/inspire_hand/ctrl/r", inspire_hand_ctrl)
-        self.sub.Init(self.write_registers_callback, 10)           
+        self.sub2 = ChannelSubscriber("rt/inspire_hand/ctrl/r", inspire_hand_ctrl)
+        self.sub2.Init(lambda msg: self.write_registers_callback(msg, 1), 10)
                    
-    def connect_to_modbus(self, max_retries, retry_delay):
+    def connect_to_modbus(self, max_retries, retry_delay, client=None):
         """连接到 Modbus 服务器，并在失败时重试"""
+        client = self.client if client is None else client
         retries = 0
         while retries < max_retries:
             try:
-                if not self.client.connect():
+                if not client.connect():
                     raise ConnectionError("Failed to connect to Modbus server.")
                 print("Modbus client connected successfully.")
                 return
             except ConnectionError as e:
                 print(f"Connection attempt {retries + 1} failed: {e}")
                 retries += 1
+                if self.stats is not None:
+                    for hand in (0, 1):
+                        if self.clients[hand] is client:
+                            self.stats.record_retry(self.hand_names[hand])
                 if retries < max_retries:
                     print(f"Retrying in {retry_delay} seconds...")
                     time.sleep(retry_delay)
                 else:
                     print("Max retries reached. Could not connect.")
                     raise   
-    def write_registers_callback(self,msg:inspire_hand_ctrl):
-        with modbus_lock:
-            if msg.mode & 0b0001:  # 模式 1 - 角度
-                self.client.write_registers(1486, msg.angle_set, self.device_id[0])
-                self.client.write_registers(1486, msg.angle_set, self.device_id[1])
-
-                # print('angle_set')
-            if msg.mode & 0b0010:  # 模式 2 - 位置
-                self.client.write_registers(1474, msg.pos_set, self.device_id[0])
-                self.client.write_registers(1474, msg.pos_set, self.device_id[1])
-
-                # print('pos_set')
-
-            if msg.mode & 0b0100:  # 模式 4 - 力控
-                self.client.write_registers(1498, msg.force_set, self.device_id[0])
-                self.client.write_registers(1498, msg.force_set, self.device_id[1])
+    def write_registers_callback(self,msg:inspire_hand_ctrl,hand=None):
+        """hand: 0 (l) or 1 (r), None writes the command to both hands"""
+        for hand in ((0, 1) if hand is None else (hand,)):
+            self.controls[hand].submit(msg)
+            self.controls[hand].flush(lambda address, values, hand=hand: self.write_registers(address, values, hand), self.locks[hand])
 
-                # print('force_set')
+    def write_registers(self, start_address, values, hand=0):
+        if self.stats is None:
+            self.clients[hand].write_registers(start_address, values, self.device_id[hand])
+        else:
+            self.stats.transaction(self.hand_names[hand], start_address, len(values), self.clients[hand].write_registers,
+                                   start_address, values, self.device_id[hand], write=True)
 
-            if msg.mode & 0b1000:  # 模式 8 - 速度
-                self.client.write_registers(1522, msg.speed_set, self.device_id[0])
-                self.client.write_registers(1522, msg.speed_set, self.device_id[1])
+    def flush_controls_locked(self, hand):
+        """Write the pending commands of every hand on the bus of `hand`, the caller holds self.locks[hand]."""
+        for other in (0, 1):
+            if self.locks[other] is self.locks[hand]:
+                self.controls[other].flush_locked(lambda address, values, other=other: self.write_registers(address, values, other))
 
     def read(self):
-        if not self.use_serial:
-            touch_msg = get_inspire_hand_touch()
-            touch_msg2 = get_inspire_hand_touch()
+        self.seqs = [(seq + 1) & 0xFFFFFFFF for seq in self.seqs]
+        frame_start_ns = time.monotonic_ns()
+        # 两只手的帧序号相同, 使用同一个相位; 帧序号从 1 开始: 第一帧为相位 0, 读取全部区域
+        phase = None if self.touch_cycle is None else self.touch_cycle.phase(self.seqs[0] - 1)
+        if self.concurrent:
+            # 独立连接: 每只手在各自的线程中完成整帧的读取/解码/发布, 两只手之间没有同步点
+            futures = [self.executor.submit(self.read_hand, hand, phase, frame_start_ns) for hand in (0, 1)]
+            return [future.result() for future in futures]
+
+        # 同一总线: 两只手的请求交替发送, 两帧同时采样
+        touch = [(None, ()), (None, ())]
+        matrixs = [{}, {}]
+        if self.read_touch:
+            if phase is None:
+                touch = self.execute_plan(self.touch_plan, self.touch_buffers)
+            else:
+                touch = self.execute_plan(phase.plan, [phase.buffer(0), phase.buffer(1)])
+                touch = [phase.scatter(registers, missing, self.touch_buffers[hand]) for hand, (registers, missing) in enumerate(touch)]
+            end_ns = time.monotonic_ns()
+            matrixs = [self.publish_touch(hand, registers, missing, frame_start_ns, end_ns) for hand, (registers, missing) in enumerate(touch)]
+        # Read the states for POS_ACT, ANGLE_ACT, etc.
+        start_ns = time.monotonic_ns()
+        states = self.execute_plan(self.state_plan, self.state_buffers)
+        end_ns = time.monotonic_ns()
+        return [self.finish_hand(hand, self.publish_states(hand, registers, missing, start_ns, end_ns), matrixs[hand], touch[hand], frame_start_ns, end_ns)
+                for hand, (registers, missing) in enumerate(states)]
 
-            matrixs = {}
-            matrixs2 = {}
+    def read_hand(self, hand, phase, frame_start_ns):
+        """_summary_
+        Read, decode and publish the frame of one hand on its own connection (executor thread of read()).
+        Args:
+            hand (int): 0 for l, 1 for r.
+            phase (TouchPhase): Phase of this frame, None without touch_divisors.
+            frame_start_ns (int): time.monotonic_ns() at the start of the frame.
+        Returns:
+            dict: {'states', 'touch'} of the hand, as read()
+        """
+        read_registers = lambda addr, count: self.read_registers(addr, count, self.device_id[hand], hand)
+        touch, matrixs = (None, ()), {}
+        if self.read_touch:
+            if phase is None:
+                touch = self.touch_plan.execute(read_registers, self.touch_buffers[hand])
+            else:
+                registers, missing = phase.plan.execute(read_registers, phase.buffer(hand))
+                touch = phase.scatter(registers, missing, self.touch_buffers[hand])
+            matrixs = self.publish_touch(hand, touch[0], touch[1], frame_start_ns, time.monotonic_ns())
+        start_ns = time.monotonic_ns()
+        registers, missing = self.state_plan.execute(read_registers, self.state_buffers[hand])
+        end_ns = time.monotonic_ns()
+        return self.finish_hand(hand, self.publish_states(hand, registers, missing, start_ns, end_ns), matrixs, touch, frame_start_ns, end_ns)
 
-            for i, (name, addr, length, size, var) in enumerate(self.data):
-                value = self.read_and_parse_registers(addr, length // 2,'short',device_id=self.device_id[0])
-                value2 = self.read_and_parse_registers(addr, length // 2,'short',device_id=self.device_id[1])
+    def publish_touch(self, hand, registers, missing, start_ns, end_ns):
+        """Decode the touch registers of one hand into its message, publish it and return the region matrices."""
+        pub = self.pub if hand == 0 else self.pub2
+        if self.flat_touch:
+            matrixs = encode_touch_flat(self.register_map, registers, missing, self.touch_flats[hand])
+            set_stamp(self.touch_flats[hand].stamp, self.seqs[hand], start_ns, end_ns)
+            pub.Write(self.touch_flats[hand])
+        else:
+            matrixs = decode_touch(self.register_map, registers, missing, self.touch_msgs[hand])
+            set_stamp(self.touch_stampeds[hand].stamp, self.seqs[hand], start_ns, end_ns)
+            pub.Write(self.touch_stampeds[hand] if self.stamped else self.touch_msgs[hand])
+        if self.touch_cycle is not None:
+            # 返回所有区域的最新值, 而不只是本帧读取的区域
+            self.touch_latests[hand].update(matrixs)
+            matrixs = dict(self.touch_latests[hand])
+        return matrixs
 
-                if value is not None:
-                    setattr(touch_msg, var, value)
-                    setattr(touch_msg2, var, value2)
+    def publish_states(self, hand, registers, missing, start_ns, end_ns):
+        """Decode the state registers of one hand into its message, publish it and return get_states_dict."""
+        states_msg = self.states_msgs[hand]
+        decode_states(self.state_plan, self.states_structure, registers, missing, states_msg)
+        set_stamp(self.states_stampeds[hand].stamp, self.seqs[hand], start_ns, end_ns)
+        (self.state_pub if hand == 0 else self.state_pub2).Write(self.states_stampeds[hand] if self.stamped else states_msg)
+        return get_states_dict(states_msg)
 
-                    matrix = np.array(value).reshape(size)
-                    matrixs2 = np.array(value2).reshape(size)
+    def finish_hand(self, hand, states, matrixs, touch, frame_start_ns, end_ns):
+        """Write the frame of one hand to its shared memory ring and history, returns {'states', 'touch'}."""
+        if self.shms is not None:
+            registers, missing = touch
+            valid = 0 if registers is None else self.register_map.valid_mask(missing)
+            self.shms[hand].write(self.seqs[hand], frame_start_ns, end_ns, registers, valid, self.states_msgs[hand])
+        self.histories[hand].append(states, time.monotonic())
+        return {'states':states,'touch':matrixs}
 
-                    matrixs[var]=matrix
-                    matrixs2[var]=matrixs2
+    def execute_plan(self, plan, buffers=(None, None)):
+        """_summary_
+        Run a read plan on both hands. On independent connections both hands are polled concurrently,
+        on a shared bus the requests of the two hands are interleaved so both frames are sampled together.
+        Args:
+            plan (ReadPlan): Plan to run.
+            buffers (list, optional): Reusable register buffer per hand, see ReadPlan.assemble. Defaults to new buffers.
+        Returns:
+            list: [(registers, missing), (registers2, missing2)] as returned by ReadPlan.execute
+        """
+        if self.concurrent:
+            futures = [self.executor.submit(plan.execute, lambda addr, count, hand=hand: self.read_registers(addr, count, self.device_id[hand], hand), buffers[hand])
+                       for hand in (0, 1)]
+            return [future.result() for future in futures]
+        responses = ([], [])
+        for start_address, count, offset in plan.requests:
+            for hand in (0, 1):
+                responses[hand].append(self.read_registers(start_address, count, self.device_id[hand], hand))
+        return [plan.assemble(responses[0], buffers[0]), plan.assemble(responses[1], buffers[1])]
 
-                    # matrixs.append(matrix)
-            self.pub.Write(touch_msg)
-            self.pub2.Write(touch_msg2)
+    def read_states(self, states_msg, device_id=1, hand=0):
+        registers, missing = self.state_plan.execute(lambda addr, count: self.read_registers(addr, count, device_id, hand), self.state_buffers[hand])
+        return decode_states(self.state_plan, self.states_structure, registers, missing, states_msg)
 
-        else:
-            matrixs = {}
-        # Read the states for POS_ACT, ANGLE_ACT, etc.
-        states_msg = get_inspire_hand_state()
-        states_msg2 = get_inspire_hand_state()
-
-        for attr_name, start_address, length, data_type in self.states_structure:
-            setattr(states_msg, attr_name, self.read_and_parse_registers(start_address, length, data_type,device_id=self.device_id[0]))
-            setattr(states_msg2, attr_name, self.read_and_parse_registers(start_address, length, data_type,device_id=self.device_id[1]))
-
-        self.state_pub.Write(states_msg)
-        self.state_pub2.Write(states_msg2)
-
-        return [{'states':{
-            'POS_ACT': states_msg.pos_act,
-            'ANGLE_ACT': states_msg.angle_act,
-            'FORCE_ACT': states_msg.force_act,
-            'CURRENT': states_msg.current,
-            'ERROR': states_msg.err,
-            'STATUS': states_msg.status,
-            'TEMP': states_msg.temperature
-        },'touch':matrixs
-                },{'states':{
-            'POS_ACT': states_msg2.pos_act,
-            'ANGLE_ACT': states_msg2.angle_act,
-            'FORCE_ACT': states_msg2.force_act,
-            'CURRENT': states_msg2.current,
-            'ERROR': states_msg2.err,
-            'STATUS': states_msg2.status,
-            'TEMP': states_msg2.temperature
-        },'touch':matrixs
-                }]
-
-    def read_and_parse_registers(self, start_address, num_registers, data_type='short',device_id=1):
-         with modbus_lock:
+    def read_registers(self, start_address, num_registers, device_id=1, hand=0):
+        with self.locks[hand]:
+            # 待发送的控制指令优先于读请求
+            self.flush_controls_locked(hand)
             # 读取寄存器
-            response = self.client.read_holding_registers(start_address, num_registers, device_id)
-
-            if not response.isError():
-                if data_type == 'short':
-                    # 将读取的寄存器打包为二进制数据
-                    packed_data = struct.pack('>' + 'H' * num_registers, *response.registers)
-                    # 将寄存器解包为带符号的 16 位整数 (short)
-                    angles = struct.unpack('>' + 'h' * num_registers, packed_data)
-                    return angles
-                elif data_type == 'byte':
-                    # 将每个 16 位寄存器拆分为两个 8 位 (uint8) 数据
-                    byte_list = []
-                    for reg in response.registers:
-                        high_byte = (reg >> 8) & 0xFF  # 高 8 位
-                        low_byte = reg & 0xFF          # 低 8 位
-                        byte_list.append(high_byte)
-                        byte_list.append(low_byte)
-                    return byte_list
+            if self.stats is None:
+                response = self.clients[hand].read_holding_registers(start_address, num_registers, device_id)
             else:
-                print("Error reading registers")
-                return None
-            
-
+                response = self.stats.transaction(self.hand_names[hand], start_address, num_registers, self.clients[hand].read_holding_registers,
+                                                  start_address, num_registers, device_id)
+        if response.isError():
+            print(f"Error reading registers {start_address}+{num_registers} of hand {self.hand_names[hand]}: {response}")
+            return None
+        return response.registers
 
+    def read_and_parse_registers(self, start_address, num_registers, data_type='short',device_id=1,hand=0):
+        registers = self.read_registers(start_address, num_registers, device_id, hand)
+        if registers is None:
+            return None
+        return decode_registers(registers, data_type)
@@ -0,0 +1,210 @@
+from unitree_sdk2py.core.channel import ChannelPublisher
+from unitree_sdk2py.idl.std_msgs.msg.dds_ import String_
+
+from pymodbus.exceptions import ModbusIOException
+from pymodbus.pdu import ExceptionResponse
+
+import bisect
+import json
+import threading
+import time
+
+# 延迟直方图的桶上界 (毫秒), 最后一个桶收集更慢的请求
+LATENCY_BUCKETS_MS = [0.5, 1, 2, 5, 10, 20, 50, 100, 200, 500, 1000]
+
+# 帧开销: TCP 为 MBAP 头 (7 字节), RTU 为从站地址 + CRC (3 字节)
+FRAME_OVERHEAD = {'tcp': 7, 'rtu': 3}
+
+# 寄存器组 (起始地址, 结束地址, 名称), 按地址对事务分类
+register_groups = [
+    (1474, 1534, 'ctrl'),
+    (1534, 1624, 'state'),
+    (3000, 5124, 'touch'),
+]
+
+
+def register_group(address):
+    for start, end, name in register_groups:
+        if start <= address < end:
+            return name
+    return 'config'
+
+
+class TransactionStats:
+    def __init__(self):
+        """Counters and latency histogram of the transactions of one (device, register group)."""
+        self.count = 0
+        self.errors = 0
+        self.timeouts = 0
+        self.exceptions = {}
+        self.bytes_tx = 0
+        self.bytes_rx = 0
+        self.latency_sum = 0.0
+        self.latency_max = 0.0
+        self.histogram = [0] * (len(LATENCY_BUCKETS_MS) + 1)
+
+    def percentile(self, q):
+        """Upper bound (ms) of the histogram bucket holding the q-th percentile, at most the maximum latency."""
+        if self.count == 0:
+            return None
+        rank = q / 100.0 * self.count
+        total = 0
+        for bound, count in zip(LATENCY_BUCKETS_MS, self.histogram):
+            total += count
+            if total >= rank:
+                return min(bound, round(self.latency_max, 3))
+        return round(self.latency_max, 3)
+
+    def to_dict(self):
+        return {
+            'count': self.count,
+            'errors': self.errors,
+            'timeouts': self.timeouts,
+            'exceptions': dict(self.exceptions),
+            'bytes_tx': self.bytes_tx,
+            'bytes_rx': self.bytes_rx,
+            'latency_ms': {
+                'mean': round(self.latency_sum / self.count, 3) if self.count else None,
+                'p50': self.percentile(50),
+                'p99': self.percentile(99),
+                'max': round(self.latency_max, 3),
+            },
+            'histogram': dict(zip([f"<={bound}" for bound in LATENCY_BUCKETS_MS] + ['>1000'], self.histogram)),
+        }
+
+
+class ModbusStats:
+    def __init__(self):
+        """_summary_
+        Per transaction Modbus instrumentation shared by the handlers: latency histogram, bytes on the wire,
+        errors, timeouts, exception codes and connection retries per device and register group.
+        Handlers only call into it when a stats object is passed, otherwise the read path is unchanged.
+        """
+        self.lock = threading.Lock()
+        self.devices = {}
+        self.retries = {}
+        self.start_time = time.monotonic()
+
+    def add_device(self, device, transport='tcp'):
+        """Register device label (e.g. 'l', 'r') with its transport, 'tcp' or 'rtu', used for the frame overhead."""
+        with self.lock:
+            self.devices.setdefault(device, {'overhead': FRAME_OVERHEAD[transport], 'groups': {}})
+            self.retries.setdefault(device, 0)
+
+    def record(self, device, group, latency, bytes_tx, bytes_rx, timeout=False, exception_code=None, error=False):
+        """_summary_
+        Record one transaction.
+        Args:
+            device (str): Device label given to add_device.
+            group (str): Register group, see register_group.
+            latency (float): Request to response time in seconds.
+            bytes_tx (int): Request PDU size in bytes, the frame overhead is added.
+            bytes_rx (int): Response PDU size in bytes (0 when nothing was received), the frame overhead is added.
+            timeout (bool, optional): No response was received. Defaults to False.
+            exception_code (int, optional): Modbus exception code of an exception response. Defaults to None.
+            error (bool, optional): Any other failure, e.g. lost connection. Defaults to False.
+        """
+        latency_ms = latency * 1000.0
+        bucket = bisect.bisect_left(LATENCY_BUCKETS_MS, latency_ms)
+        with self.lock:
+            entry = self.devices.setdefault(device, {'overhead': 0, 'groups': {}})
+            stats = entry['groups'].get(group)
+            if stats is None:
+                stats = entry['groups'][group] = TransactionStats()
+            stats.count += 1
+            stats.bytes_tx += bytes_tx + entry['overhead']
+            if bytes_rx:
+                stats.bytes_rx += bytes_rx + entry['overhead']
+            stats.latency_sum += latency_ms
+            stats.latency_max = max(stats.latency_max, latency_ms)
+            stats.histogram[bucket] += 1
+            if timeout or exception_code is not None or error:
+                stats.errors += 1
+            if timeout:
+                stats.timeouts += 1
+            if exception_code is not None:
+                stats.exceptions[exception_code] = stats.exceptions.get(exception_code, 0) + 1
+
+    def record_retry(self, device):
+        with self.lock:
+            self.retries[device] = self.retries.get(device, 0) + 1
+
+    def transaction(self, device, start_address, count, call, *args, write=False):
+        """_summary_
+        Run a pymodbus client call (read_holding_registers / write_registers / write_register) and record it.
+        Exceptions raised by the client are recorded as errors and re-raised.
+        Returns:
+            the pymodbus response
+        """
+        bytes_tx = 6 + 2 * count if write else 5
+        group = register_group(start_address)
+        start = time.perf_counter()
+        try:
+            response = call(*args)
+        except Exception:
+            self.record(device, group, time.perf_counter() - start, bytes_tx, 0, error=True)
+            raise
+        latency = time.perf_counter() - start
+        if isinstance(response, ModbusIOException):
+            self.record(device, group, latency, bytes_tx, 0, timeout=True)
+        elif isinstance(response, ExceptionResponse):
+            self.record(device, group, latency, bytes_tx, 2, exception_code=response.exception_code)
+        elif response.isError():
+            self.record(device, group, latency, bytes_tx, 0, error=True)
+        else:
+            self.record(device, group, latency, bytes_tx, 5 if write else 2 + 2 * count)
+        return response
+
+    def snapshot(self):
+        """Queryable view of all counters: {'uptime_s', 'devices': {device: {'retries', 'groups': {group: {...}}}}}."""
+        with self.lock:
+            return {
+                'uptime_s': round(time.monotonic() - self.start_time, 3),
+                'devices': {device: {'retries': self.retries.get(device, 0),
+                                     'groups': {group: stats.to_dict() for group, stats in entry['groups'].items()}}
+                            for device, entry in self.devices.items()},
+            }
+
+    def reset(self):
+        with self.lock:
+            for entry in self.devices.values():
+                entry['groups'] = {}
+            self.retries = {device: 0 for device in self.retries}
+            self.start_time = time.monotonic()
+
+
+class DiagnosticsPublisher:
+    def __init__(self, stats, topic="rt/inspire_hand/diagnostics", period=1.0):
+        """_summary_
+        Periodically publish ModbusStats.snapshot() as JSON in a std_msgs String_ on a DDS topic.
+        Args:
+            stats (ModbusStats): Stats to publish.
+            topic (str, optional): DDS topic. Defaults to "rt/inspire_hand/diagnostics".
+            period (float, optional): Publish period in seconds. Defaults to 1.0.
+        """
+        self.stats = stats
+        self.period = period
+        self.pub = ChannelPublisher(topic, String_)
+        self.pub.Init()
+        self._quit = threading.Event()
+        self._thread = None
+
+    def start(self):
+        if self._thread is None:
+            self._quit.clear()
+            self._thread = threading.Thread(target=self._run, name="inspire_diagnostics", daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self):
+        self._quit.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def publish(self):
+        self.pub.Write(String_(json.dumps(self.stats.snapshot())))
+
+    def _run(self):
+        while not self._quit.wait(self.period):
+            self.publish()
@@ -2,6 +2,8 @@ import pyqtgraph as pg
 from PyQt5 import QtCore
 from PyQt5.QtWidgets import QApplication, QMainWindow, QTabWidget, QWidget, QGridLayout,QLabel,QVBoxLayout
 from .inspire_hand_defaut import *
+from .timeseries import TimeSeriesRing, state_groups
+from .register_map import get_register_map
 import colorcet  # 确保安装 colorcet 库
 import numpy as np
 import time
@@ -15,16 +17,17 @@ class ImageTab(QWidget):
         self.grid_layout=QGridLayout()   
         self.layout.addLayout(self.grid_layout)   
         self.data_sheet=datas
+        self.register_map=get_register_map(datas)
         
         self.create_images()
 
     def create_images(self):
         num_cols = 4  # 每行的列数
-        num_rows = (len(data_sheet) + num_cols - 1) // num_cols  # 计算行数
+        num_rows = (len(self.register_map) + num_cols - 1) // num_cols  # 计算行数
         self.plots = []
         self.color_maps = []
         self.color_bars = []
-        for i, (name, addr, length, size, var) in enumerate(self.data_sheet):
+        for i, region in enumerate(self.register_map):
                 
             row = i // num_cols  # 计算当前行
             col = i % num_cols  # 计算当前列            # 创建随机大小的图像数据
@@ -36,8 +39,8 @@ class ImageTab(QWidget):
             layout_widget = pg.GraphicsLayoutWidget(show=True)
             plot_item = layout_widget.addPlot(row=0, col=0)
             # 为图块设置名字
-            plot_item.setTitle(name)
-            img_item = pg.ImageItem(np.random.rand(size[0],size[1]))
+            plot_item.setTitle(region.name)
+            img_item = pg.ImageItem(np.random.rand(*region.shape))
             plot_item.addItem(img_item)
             self.plots.append(img_item)
 
@@ -53,16 +56,17 @@ class ImageTab(QWidget):
             # 将图形布局添加到网格
             self.grid_layout.addWidget(layout_widget, row, col)
     def update_plot(self,data_dict):
-        for i, (name, addr, length, size,var) in enumerate(self.data_sheet):
-            self.plots[i].setImage(data_dict[var], autoLevels=True)  # 更新图像数据
-            max_val = np.max(data_dict[var])
+        for i, region in enumerate(self.register_map.regions):
+            self.plots[i].setImage(data_dict[region.var], autoLevels=True)  # 更新图像数据
+            max_val = np.max(data_dict[region.var])
             self.plots[i].setLevels((0, max_val))  # 设置图像颜色范围
             # 更新颜色条
             self.color_bars[i].setLevels((0, max_val))  # 更新颜色条的范围
             self.plots[i].setColorMap(self.color_maps[i])  # 设置颜色映射
 
 class CurveTab(QWidget):
-    def __init__(self,datas=data_sheet,history_len=100):
+    def __init__(self,datas=data_sheet,history_len=100,history=None):
+        """history: TimeSeriesRing filled by the driver (e.g. ModbusDataHandler.history), None keeps an own ring filled in update_plot"""
         super().__init__()
         self.layout = QVBoxLayout()
         self.setLayout(self.layout)  
@@ -71,15 +75,9 @@ class CurveTab(QWidget):
         self.layout.addLayout(self.grid_layout)   
         self.data_sheet=datas
         self.history_length = history_len
-        self.history = {
-        'POS_ACT': [np.zeros(history_len) for _ in range(6)],   # 6 个数据点
-        'ANGLE_ACT': [np.zeros(history_len) for _ in range(6)], # 6 个数据点
-        'FORCE_ACT': [np.zeros(history_len) for _ in range(6)], # 6 个数据点
-        'CURRENT': [np.zeros(history_len) for _ in range(6)],   # 6 个数据点
-        'ERROR': [np.zeros(history_len) for _ in range(6)],     # 6 个数据点
-        'STATUS': [np.zeros(history_len) for _ in range(6)],    # 6 个数据点
-        'TEMP': [np.zeros(history_len) for _ in range(6)]       # 6 个数据点
-        }
+        # 环形缓冲区, 读取为零拷贝的有序视图, 不再每帧 np.roll
+        self.own_history = history is None
+        self.history = TimeSeriesRing(state_groups, history_len) if history is None else history
         self.create_curves()
         
 
@@ -122,15 +120,15 @@ class CurveTab(QWidget):
     def update_plot(self,data_dict):
         # 更新每个曲线的数据
         try:
+            # 追加新的数据点到历史记录 (由驱动填充时跳过)
+            if self.own_history:
+                self.history.append(data_dict)
             # 更新每个曲线的数据
             for category, datas in data_dict.items():
                 if datas is not None:
+                    history = self.history.group(category, self.history_length)
                     for i in range(len(datas)):
-                        # 追加新的数据点到历史记录，并移除最老的数据点
-                        self.history[category][i] = np.roll(self.history[category][i], -1)
-                        self.history[category][i][-1] = datas[i]
-                        # 更新曲线
-                        self.curves[category][i].setData(self.history[category][i])
+                        self.curves[category][i].setData(history[i])
                 else:
                     raise ValueError(f"Data for category '{category}' is None")
 
@@ -156,7 +154,9 @@ class MainWindow(QMainWindow):
         self.run_time=run_time
         self.tabs = QTabWidget()
         self.image_tab = ImageTab(data)
-        self.curve_tab = CurveTab(data)
+        # 驱动自带状态历史时直接绘制它, 否则 CurveTab 自己记录
+        history = getattr(data_handler, 'history', None)
+        self.curve_tab = CurveTab(data, history=history if isinstance(history, TimeSeriesRing) else None)
         if Plot_touch:
             self.tabs.addTab(self.image_tab, "Images")
         self.tabs.addTab(self.curve_tab, "Curves")
@@ -167,6 +167,8 @@ class MainWindow(QMainWindow):
         start_time = time.time()  # 记录开始时间
         data_dict =self.data_handler.read()
         end_time = time.time()  # 记录结束时间
+        if data_dict is None:
+            return  # 还没有数据 (例如 AcquisitionService 尚未读到第一帧)
         self.curve_tab.update_plot(data_dict['states'])
         if self.Plot_touch_:
             self.image_tab.update_plot(data_dict['touch'])
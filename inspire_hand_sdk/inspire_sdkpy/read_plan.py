@@ -0,0 +1,121 @@
+MAX_READ_REGISTERS = 125   # Modbus 功能码 0x03 单次最多读取 125 个寄存器
+REGISTER_STRIDE = 2        # 灵巧手寄存器按字节编址, 每个 16 位寄存器占 2 个地址
+
+
+class ReadPlan:
+    def __init__(self, requests, fields, num_registers):
+        """_summary_
+        Compiled list of Modbus read requests covering a register map. The registers returned by all
+        requests are concatenated into one flat buffer, each field is a contiguous slice of that buffer.
+        Args:
+            requests (list): List of (start_address, num_registers, buffer_offset) tuples, one per Modbus request.
+            fields (dict): key -> (buffer_offset, num_registers, request_indices).
+            num_registers (int): Total number of registers in the flat buffer.
+        """
+        self.requests = requests
+        self.fields = fields
+        self.num_registers = num_registers
+
+    def __len__(self):
+        return len(self.requests)
+
+    def execute(self, read, out=None):
+        """_summary_
+        Run every request of the plan in order.
+        Args:
+            read (callable): read(start_address, num_registers) -> list of registers, or None on error.
+            out (np.ndarray, optional): Reusable buffer of num_registers registers, see assemble. Defaults to None.
+        Returns:
+            tuple: (registers, missing) flat register buffer and set of field keys whose request failed.
+        """
+        return self.assemble([read(start_address, count) for start_address, count, offset in self.requests], out)
+
+    def assemble(self, responses, out=None):
+        """_summary_
+        Concatenate the responses of the plan requests (None for a failed request) into the flat buffer.
+        Args:
+            responses (list): Registers returned by each request, None for a failed request.
+            out (np.ndarray, optional): Buffer of num_registers registers filled in place and returned, the
+                slots of failed requests keep their previous content. Defaults to None, a new zeroed list.
+        Returns:
+            tuple: (registers, missing) flat register buffer and set of field keys whose request failed.
+        """
+        registers = [0] * self.num_registers if out is None else out
+        failed = set()
+        for index, ((start_address, count, offset), values) in enumerate(zip(self.requests, responses)):
+            if values is None:
+                failed.add(index)
+                continue
+            registers[offset:offset + count] = values
+        missing = set()
+        if failed:
+            missing = {key for key, (_, _, indices) in self.fields.items() if failed.intersection(indices)}
+        return registers, missing
+
+    def slice(self, values, key):
+        """Return the part of a flat (decoded) buffer that belongs to field `key`."""
+        offset, count, _ = self.fields[key]
+        return values[offset:offset + count]
+
+
+def compile_read_plan(fields, max_registers=MAX_READ_REGISTERS, max_gap=None):
+    """_summary_
+    Merge a register map into the fewest Modbus read requests, each at most `max_registers` long.
+    Fields that are contiguous (or separated by a gap of at most `max_gap` registers) are read together,
+    fields longer than a request are split over consecutive requests.
+    Args:
+        fields (list): List of (key, start_address, num_registers) tuples.
+        max_registers (int, optional): Maximum registers per request. Defaults to MAX_READ_REGISTERS.
+        max_gap (int, optional): Largest unused gap (in registers) a request may read across. Defaults to None, any gap.
+    Returns:
+        ReadPlan: the compiled plan
+    """
+    window = max_registers * REGISTER_STRIDE
+    ordered = sorted(fields, key=lambda field: field[1])
+
+    # 合并为需要读取的地址区间 [start, end)
+    ranges = []
+    for key, start_address, num_registers in ordered:
+        end_address = start_address + num_registers * REGISTER_STRIDE
+        if ranges and start_address <= ranges[-1][1]:
+            ranges[-1][1] = max(ranges[-1][1], end_address)
+        else:
+            ranges.append([start_address, end_address])
+
+    # 贪心覆盖: 每个请求从第一个未覆盖的地址开始, 尽量读满 max_registers
+    requests = []
+    offset = 0
+    index = 0
+    while index < len(ranges):
+        start = ranges[index][0]
+        end = min(ranges[index][1], start + window)
+        while end == ranges[index][1] and index + 1 < len(ranges):
+            next_start, next_end = ranges[index + 1]
+            gap = next_start - end
+            if (max_gap is not None and gap > max_gap * REGISTER_STRIDE) \
+                    or (next_start - start) % REGISTER_STRIDE or next_start >= start + window:
+                break
+            index += 1
+            end = min(next_end, start + window)
+        count = (end - start + REGISTER_STRIDE - 1) // REGISTER_STRIDE
+        requests.append((start, count, offset))
+        offset += count
+        if end < ranges[index][1]:
+            ranges[index][0] = end          # 区间过长, 剩余部分由下一个请求继续读取
+        else:
+            index += 1
+
+    plan_fields = {}
+    for key, start_address, num_registers in ordered:
+        end_address = start_address + num_registers * REGISTER_STRIDE
+        indices = [i for i, (start, count, _) in enumerate(requests)
+                   if start < end_address and start_address < start + count * REGISTER_STRIDE]
+        first_start, _, first_offset = requests[indices[0]]
+        plan_fields[key] = ((start_address - first_start) // REGISTER_STRIDE + first_offset, num_registers, indices)
+
+    return ReadPlan(requests, plan_fields, offset)
+
+
+def touch_read_plan(data, max_registers=MAX_READ_REGISTERS):
+    """Compile a read plan for a tactile register definition such as data_sheet (length is in bytes)."""
+    return compile_read_plan([(var, addr, length // 2) for name, addr, length, size, var in data], max_registers)
@@ -0,0 +1,87 @@
+import numpy as np
+
+
+def decode_short(registers):
+    """_summary_
+    Reinterpret 16 bit register payloads as signed shorts in one vectorized step.
+    Args:
+        registers (list | np.ndarray): Register values as returned by pymodbus (0..65535).
+    Returns:
+        np.ndarray: int16 array, a view of the uint16 input when it already is an array.
+    """
+    return np.asarray(registers, dtype=np.uint16).view(np.int16)
+
+
+def decode_byte(registers):
+    """_summary_
+    Split every 16 bit register into its (high, low) bytes.
+    Args:
+        registers (list | np.ndarray): Register values as returned by pymodbus (0..65535).
+    Returns:
+        np.ndarray: uint8 array of length 2 * len(registers), high byte first.
+    """
+    return np.asarray(registers, dtype='>u2').view(np.uint8)
+
+
+decoders = {
+    'short': decode_short,
+    'byte': decode_byte,
+}
+
+
+def decode_registers(registers, data_type='short'):
+    """Decode register payloads into a typed NumPy array, data_type is 'short' or 'byte'."""
+    return decoders[data_type](registers)
+
+
+def decode_touch(register_map, registers, missing, touch_msg):
+    """_summary_
+    Decode a flat tactile register buffer read with register_map.plan into touch_msg (in place) and per region matrices.
+    Args:
+        register_map (RegisterMap): Compiled tactile register definition, see register_map.get_register_map.
+        registers (list | np.ndarray): Flat register buffer returned by register_map.plan.execute.
+        missing (set): Regions whose request failed, they are left untouched.
+        touch_msg (inspire_hand_touch): Message to fill.
+    Returns:
+        dict: var -> matrix (int16 reshaped to the region size)
+    """
+    # 拷贝一次: 返回的矩阵不能引用会被下一帧覆盖的寄存器缓冲区
+    values = register_map.frame(registers)
+    matrixs = {}
+    for region in register_map.regions:
+        if region.var not in missing:
+            value = values[region.slice]
+            setattr(touch_msg, region.var, value.tolist())
+            matrixs[region.var] = value.reshape(region.shape)
+    return matrixs
+
+
+def decode_states(plan, states_structure, registers, missing, states_msg):
+    """Decode a flat state register buffer read with `plan` into states_msg (in place)."""
+    for attr_name, start_address, length, data_type in states_structure:
+        if attr_name not in missing:
+            setattr(states_msg, attr_name, decode_registers(plan.slice(registers, attr_name), data_type).tolist())
+    return states_msg
+
+
+def encode_touch_flat(register_map, registers, missing, flat_msg):
+    """_summary_
+    Fill an inspire_hand_touch_flat message from a tactile register buffer read with register_map.plan: one
+    int16 array of all taxels plus the region-valid bitmask.
+    Returns:
+        dict: var -> matrix of the valid regions, views of the published taxel array
+    """
+    values = register_map.frame(registers)
+    flat_msg.taxels = values
+    flat_msg.valid = register_map.valid_mask(missing)
+    return register_map.views(values, flat_msg.valid)
+
+
+def decode_touch_flat(flat_msg, register_map):
+    """_summary_
+    Decode a received inspire_hand_touch_flat message in one step.
+    Returns:
+        tuple: (taxels, matrixs) the int16 array of all taxels and var -> matrix views of the valid regions
+    """
+    values = np.asarray(flat_msg.taxels, dtype=np.int16)
+    return values, register_map.views(values, flat_msg.valid)
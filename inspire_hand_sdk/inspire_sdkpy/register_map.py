@@ -0,0 +1,126 @@
+from .inspire_hand_defaut import data_sheet
+from .read_plan import compile_read_plan, MAX_READ_REGISTERS
+
+import numpy as np
+
+# 手指编号, 与 data_sheet 变量名前缀一致: 小拇指, 无名指, 中指, 食指, 大拇指, 掌心
+FINGERS = ('fingerone', 'fingertwo', 'fingerthree', 'fingerfour', 'fingerfive', 'palm')
+
+
+class Region:
+    def __init__(self, index, name, address, length, shape, var, offset):
+        """_summary_
+        One tactile region of a register definition with everything consumers need precomputed.
+        Args:
+            index (int): Position in the register definition, bit `index` of the region-valid mask.
+            name (str): Display name, e.g. "小拇指指端触觉数据".
+            address (int): Start address (byte addressed).
+            length (int): Length in bytes.
+            shape (tuple): Matrix shape (rows, cols).
+            var (str): Field name, e.g. "fingerone_tip_touch".
+            offset (int): Offset of the first taxel in the flat frame (regions in definition order).
+        """
+        self.index = index
+        self.name = name
+        self.address = address
+        self.length = length
+        self.shape = tuple(shape)
+        self.var = var
+        self.num_registers = length // 2
+        self.offset = offset
+        self.slice = slice(offset, offset + self.num_registers)
+        self.bit = 1 << index
+        # 由变量名解析一次: fingerone_tip_touch -> ('fingerone', 'tip'), palm_touch -> ('palm', 'palm')
+        parts = var.split('_')
+        self.finger = parts[0]
+        self.segment = parts[1] if len(parts) > 2 else parts[0]
+        self.finger_index = FINGERS.index(self.finger) if self.finger in FINGERS else None
+        self.plan_offset = None
+
+    def __repr__(self):
+        return f"Region({self.var}, address={self.address}, shape={self.shape}, offset={self.offset})"
+
+
+class RegisterMap:
+    def __init__(self, data=data_sheet, max_registers=MAX_READ_REGISTERS, max_gap=None):
+        """_summary_
+        Compiled tactile register definition shared by the driver, GUIs and loggers. Region offsets into the
+        flat frame (all taxels in definition order), slices, shapes, finger/segment metadata and the read plan
+        are derived once, so per frame code only indexes.
+        Args:
+            data (list, optional): Tactile sensor register definition. Defaults to data_sheet.
+            max_registers (int, optional): see compile_read_plan. Defaults to MAX_READ_REGISTERS.
+            max_gap (int, optional): see compile_read_plan. Defaults to None.
+        """
+        self.data = data
+        self.regions = []
+        offset = 0
+        for index, (name, addr, length, size, var) in enumerate(data):
+            self.regions.append(Region(index, name, addr, length, size, var, offset))
+            offset += length // 2
+        self.num_taxels = offset
+        self.by_var = {region.var: region for region in self.regions}
+        self.fingers = {}
+        for region in self.regions:
+            self.fingers.setdefault(region.finger, []).append(region)
+        self.all_valid = (1 << len(self.regions)) - 1
+
+        self.plan = compile_read_plan([(region.var, region.address, region.num_registers) for region in self.regions],
+                                      max_registers, max_gap)
+        for region in self.regions:
+            region.plan_offset = self.plan.fields[region.var][0]
+        # 读取缓冲区 -> 扁平帧的索引, 缓冲区已按定义顺序排列时为 None (data_sheet 即是如此)
+        layout = np.concatenate([np.arange(region.plan_offset, region.plan_offset + region.num_registers) for region in self.regions])
+        self.layout = None if np.array_equal(layout, np.arange(self.num_taxels)) else layout
+
+    def __len__(self):
+        return len(self.regions)
+
+    def __iter__(self):
+        return iter(self.regions)
+
+    def __getitem__(self, var):
+        return self.by_var[var]
+
+    def frame(self, registers):
+        """Copy a register buffer read with self.plan into a new int16 flat frame in definition order."""
+        values = np.array(registers, dtype=np.uint16)
+        if self.layout is not None:
+            values = values[self.layout]
+        return values.view(np.int16)
+
+    def valid_mask(self, missing=()):
+        """Region-valid bitmask, every region except the field names in `missing`."""
+        mask = self.all_valid
+        for var in missing:
+            mask &= ~self.by_var[var].bit
+        return mask
+
+    def views(self, frame, valid=None):
+        """_summary_
+        Split a flat frame into per region matrices without copying.
+        Args:
+            frame (np.ndarray): Flat frame of num_taxels values in definition order.
+            valid (int, optional): Region-valid bitmask, regions whose bit is clear are left out. Defaults to None, all regions.
+        Returns:
+            dict: var -> matrix view of frame
+        """
+        if valid is None:
+            return {region.var: frame[region.slice].reshape(region.shape) for region in self.regions}
+        return {region.var: frame[region.slice].reshape(region.shape) for region in self.regions if valid & region.bit}
+
+    def regions_of(self, finger):
+        """Regions of one finger ('fingerone' ... 'fingerfive', 'palm'), tip first."""
+        return self.fingers.get(finger, [])
+
+
+_register_maps = {}
+
+
+def get_register_map(data=data_sheet):
+    """Shared RegisterMap of a register definition (default read plan), compiled on first use."""
+    key = tuple((name, addr, length, tuple(size), var) for name, addr, length, size, var in data)
+    register_map = _register_maps.get(key)
+    if register_map is None:
+        register_map = _register_maps[key] = RegisterMap(data)
+    return register_map
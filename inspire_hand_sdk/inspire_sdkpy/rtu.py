@@ -0,0 +1,26 @@
+import struct
+
+
+def crc16(frame):
+    """Modbus RTU CRC-16 (poly 0xA001, init 0xFFFF), returned as the 2 bytes appended to the frame."""
+    crc = 0xFFFF
+    for byte in frame:
+        crc ^= byte
+        for _ in range(8):
+            crc = (crc >> 1) ^ 0xA001 if crc & 1 else crc >> 1
+    return struct.pack('<H', crc)
+
+
+def read_request(device_id, start_address, count):
+    """RTU frame of a read holding registers (0x03) request."""
+    frame = struct.pack('>BBHH', device_id, 0x03, start_address, count)
+    return frame + crc16(frame)
+
+
+def parse_read_response(frame, device_id, count):
+    """Registers of a read holding registers response frame, None when it is not a valid answer of `device_id`."""
+    if len(frame) != 5 + 2 * count or frame[0] != device_id or frame[1] != 0x03 or frame[2] != 2 * count:
+        return None
+    if crc16(frame[:-2]) != frame[-2:]:
+        return None
+    return list(struct.unpack('>%dH' % count, frame[3:-2]))
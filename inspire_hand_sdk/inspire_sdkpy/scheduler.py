@@ -0,0 +1,172 @@
+from .inspire_hand_defaut import *
+from .read_plan import compile_read_plan
+from .register_map import RegisterMap
+from .register_decode import decode_touch, decode_states
+
+import numpy as np
+import time
+
+
+class RegisterGroup:
+    def __init__(self, name, fields, rate, priority=0, touch=False, max_gap=0):
+        """_summary_
+        A set of registers read together at its own target rate.
+        Args:
+            name (str): Group name, e.g. 'angle_act' or 'touch'.
+            fields (list): List of (attribute_name, start_address, num_registers, data_type) like states_structure,
+                for touch groups the data_sheet entries (name, addr, length, size, var).
+            rate (float): Target read rate in Hz.
+            priority (int, optional): Urgency of the group when several are due, see MultiRateScheduler. Defaults to 0.
+            touch (bool, optional): Fields are tactile regions published on the touch topic. Defaults to False.
+            max_gap (int, optional): see compile_read_plan. Defaults to 0.
+        """
+        self.name = name
+        self.fields = fields
+        self.rate = rate
+        self.period = 1.0 / rate
+        self.priority = priority
+        self.touch = touch
+        if touch:
+            self.register_map = RegisterMap(fields, max_gap=max_gap)
+            self.plan = self.register_map.plan
+        else:
+            self.plan = compile_read_plan([(attr_name, start_address, length) for attr_name, start_address, length, data_type in fields], max_gap=max_gap)
+
+
+def default_groups(data=data_sheet, touch=True):
+    """Angles at 200 Hz, force 100 Hz, touch 60 Hz, position/status 50 Hz, current 20 Hz, error 2 Hz, temperature 1 Hz."""
+    groups = [
+        RegisterGroup('angle_act', [('angle_act', 1546, 6, 'short')], 200, priority=3),
+        RegisterGroup('force_act', [('force_act', 1582, 6, 'short')], 100, priority=2),
+        RegisterGroup('status', [('status', 1612, 3, 'byte')], 50, priority=2),
+        RegisterGroup('pos_act', [('pos_act', 1534, 6, 'short')], 50, priority=1),
+        RegisterGroup('current', [('current', 1594, 6, 'short')], 20, priority=1),
+        RegisterGroup('err', [('err', 1606, 3, 'byte')], 2, priority=0),
+        RegisterGroup('temperature', [('temperature', 1618, 3, 'byte')], 1, priority=0),
+    ]
+    if touch:
+        groups.append(RegisterGroup('touch', data, 60, priority=1, touch=True))
+    return groups
+
+
+class ScheduledReader:
+    def __init__(self, read, groups=None, pub=None, state_pub=None):
+        """_summary_
+        Per hand runtime of the scheduled groups. Keeps the latest touch/state messages, every completed group
+        updates its fields and republishes the message it belongs to.
+        Args:
+            read (callable): read(start_address, num_registers) -> list of registers or None, e.g. ModbusDataHandler.read_registers.
+            groups (list, optional): RegisterGroup list. Defaults to default_groups().
+            pub (ChannelPublisher, optional): touch publisher. Defaults to None.
+            state_pub (ChannelPublisher, optional): state publisher. Defaults to None.
+        """
+        self.read = read
+        self.groups = default_groups(touch=pub is not None) if groups is None else groups
+        self.pub = pub
+        self.state_pub = state_pub
+        self.touch_msg = get_inspire_hand_touch()
+        self.states_msg = get_inspire_hand_state()
+        self.touch = {}
+        now = time.monotonic()
+        self.next_due = [now for _ in self.groups]
+        self.cursor = [0 for _ in self.groups]
+        self.responses = [[] for _ in self.groups]
+        self.buffers = [np.zeros(group.plan.num_registers, dtype=np.uint16) for group in self.groups]
+        self.completed = [0 for _ in self.groups]
+        self.start_time = now
+
+    def step(self, index, now):
+        """Issue the next request of group `index`, returns True when the group completed a full read."""
+        group = self.groups[index]
+        start_address, count, offset = group.plan.requests[self.cursor[index]]
+        self.responses[index].append(self.read(start_address, count))
+        self.cursor[index] += 1
+        if self.cursor[index] < len(group.plan.requests):
+            return False
+
+        registers, missing = group.plan.assemble(self.responses[index], self.buffers[index])
+        self.cursor[index] = 0
+        self.responses[index] = []
+        if group.touch:
+            self.touch.update(decode_touch(group.register_map, registers, missing, self.touch_msg))
+            if self.pub is not None:
+                self.pub.Write(self.touch_msg)
+        else:
+            decode_states(group.plan, group.fields, registers, missing, self.states_msg)
+            if self.state_pub is not None:
+                self.state_pub.Write(self.states_msg)
+
+        self.completed[index] += 1
+        self.next_due[index] += group.period
+        if self.next_due[index] < now - group.period:
+            self.next_due[index] = now  # 总线带宽不足时不累积欠账
+        return True
+
+    def frame(self):
+        return {'states': get_states_dict(self.states_msg), 'touch': self.touch}
+
+    def rates(self):
+        """Achieved read rate (Hz) per group since start."""
+        elapsed = time.monotonic() - self.start_time
+        return {group.name: completed / elapsed for group, completed in zip(self.groups, self.completed)}
+
+
+class MultiRateScheduler:
+    def __init__(self, readers):
+        """_summary_
+        Interleaves the register groups of one or more hands on the available bus bandwidth. Each step issues
+        a single Modbus request of the most urgent due group, so a long group such as touch never holds back a
+        fast one such as angles for more than one request. Urgency is the group priority plus how many periods
+        it is overdue, so low priority groups still get their turn when the bus is saturated.
+        Args:
+            readers (list): ScheduledReader per hand, hands on one shared bus belong in the same scheduler.
+        """
+        self.readers = readers
+
+    @classmethod
+    def for_handler(cls, handler, groups=None):
+        """Build the scheduler for a ModbusDataHandler or ModbusDataHandlerDouble, reusing its connection and publishers."""
+        if getattr(handler, 'stamped', False):
+            raise ValueError("MultiRateScheduler publishes plain messages, create the handler with stamped=False")
+        if getattr(handler, 'flat_touch', False):
+            raise ValueError("MultiRateScheduler publishes per-region touch messages, create the handler with flat_touch=False")
+        if hasattr(handler, 'clients'):
+            return cls([
+                ScheduledReader(lambda addr, count: handler.read_registers(addr, count, handler.device_id[0], 0), groups,
+                                getattr(handler, 'pub', None), handler.state_pub),
+                ScheduledReader(lambda addr, count: handler.read_registers(addr, count, handler.device_id[1], 1), groups,
+                                getattr(handler, 'pub2', None), handler.state_pub2),
+            ])
+        return cls([ScheduledReader(handler.read_registers, groups, getattr(handler, 'pub', None), handler.state_pub)])
+
+    def step(self):
+        """Run one request, sleeping until a group is due. Returns (reader, group, completed)."""
+        while True:
+            now = time.monotonic()
+            best = None
+            earliest = None
+            for reader in self.readers:
+                for index, group in enumerate(reader.groups):
+                    due = reader.next_due[index]
+                    if due <= now:
+                        urgency = group.priority + (now - due) / group.period
+                        if best is None or urgency > best[0]:
+                            best = (urgency, reader, index)
+                    elif earliest is None or due < earliest:
+                        earliest = due
+            if best is not None:
+                break
+            time.sleep(earliest - now)
+        _, reader, index = best
+        return reader, reader.groups[index], reader.step(index, now)
+
+    def read(self):
+        """Step until any group completes and return the latest frame(s), compatible with handler.read()."""
+        while not self.step()[2]:
+            pass
+        frames = [reader.frame() for reader in self.readers]
+        return frames[0] if len(frames) == 1 else frames
+
+    def run(self):
+        while True:
+            self.step()
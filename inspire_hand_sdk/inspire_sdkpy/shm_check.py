@@ -0,0 +1,101 @@
+from .shm_ring import ShmFrameWriter, ShmFrameReader, frame_checksum, LOCK, SEQ, CHECKSUM, NUM_STATES, STATE_ATTRS
+
+from types import SimpleNamespace
+import multiprocessing
+import numpy as np
+import argparse
+import time
+
+
+def _check_writer(name, slots, ready, stop):
+    """Integrity check writer process: every frame's content is derived from its seq, see _check_frame."""
+    writer = ShmFrameWriter(name, slots=slots)
+    register_map = writer.register_map
+    offsets = np.arange(register_map.plan.num_registers)
+    ready.set()
+    try:
+        seq = 0
+        while not stop.is_set():
+            seq += 1
+            registers = ((seq + offsets) & 0x7fff).astype(np.uint16)
+            states = SimpleNamespace(**{attr: [(seq + 6 * i + j) & 0x7fff for j in range(6)] for i, attr in enumerate(STATE_ATTRS)})
+            writer.write(seq, 1000 * seq, 1000 * seq + 1, registers, seq & register_map.all_valid, states)
+    finally:
+        writer.close()
+
+
+def _check_frame(register_map, offsets, seq, valid, acq_start_ns, acq_end_ns, taxels, states):
+    """True when a frame is the one _check_writer wrote for its seq."""
+    expected = register_map.frame((seq + offsets) & 0x7fff)
+    return valid == seq & register_map.all_valid and acq_start_ns == 1000 * seq and acq_end_ns == 1000 * seq + 1 \
+        and np.array_equal(taxels, expected) and np.array_equal(states, (seq + np.arange(NUM_STATES)) & 0x7fff)
+
+
+def check_integrity(duration=5.0, slots=2, name='inspire_hand_check'):
+    """_summary_
+    Concurrent cross-process integrity check of the ring: a writer process publishes frames as fast as it can
+    into a small ring while this process reads them, every frame returned by latest() must be intact. The slot
+    being written is also copied without the seqlock, the checksum must reject every inconsistent such copy.
+    Args:
+        duration (float, optional): Seconds to run. Defaults to 5.0.
+        slots (int, optional): Ring slots, few slots make the writer overwrite frames being read. Defaults to 2.
+        name (str, optional): Shared memory name. Defaults to 'inspire_hand_check'.
+    Returns:
+        dict: frames, bad (frames from latest() that were not intact), retries, torn, unlocked (copies without
+              the seqlock), inconsistent (of those, not a single frame), missed (inconsistent with a valid checksum)
+    """
+    ready, stop = multiprocessing.Event(), multiprocessing.Event()
+    process = multiprocessing.Process(target=_check_writer, args=(name, slots, ready, stop))
+    process.start()
+    if not ready.wait(10):
+        process.terminate()
+        raise RuntimeError("integrity check writer did not start")
+    reader = ShmFrameReader(name)
+    register_map = reader.register_map
+    offsets = np.arange(register_map.plan.num_registers)
+    result = dict(frames=0, bad=0, unlocked=0, inconsistent=0, missed=0)
+    deadline = time.monotonic() + duration
+    try:
+        while time.monotonic() < deadline:
+            frame = reader.latest()
+            if frame is None:
+                continue
+            result['frames'] += 1
+            if not _check_frame(register_map, offsets, frame.seq, frame.valid, frame.acq_start_ns, frame.acq_end_ns, frame.taxels, frame.states):
+                result['bad'] += 1
+            # 不加锁拷贝正在写入的槽位: 校验和必须识别出所有不一致的拷贝
+            count = reader.count
+            slot = count % reader.slots
+            meta = reader.arrays.meta[slot]
+            lock, fields, payload = int(meta[LOCK]), meta[SEQ:CHECKSUM + 1].copy(), reader.arrays.payload[slot].copy()
+            lock += lock % 2    # 写入中: 按写完后的锁字校验
+            values = payload.view(np.int16)
+            seq, valid, acq_start_ns, acq_end_ns = (int(value) for value in fields[:-1])
+            result['unlocked'] += 1
+            if not _check_frame(register_map, offsets, seq, valid, acq_start_ns, acq_end_ns, values[:reader.num_taxels], values[reader.num_taxels:]):
+                result['inconsistent'] += 1
+                if frame_checksum(lock, fields[:-1], payload) == fields[-1]:
+                    result['missed'] += 1
+    finally:
+        stop.set()
+        process.join()
+        reader.close()
+    result.update(retries=reader.retries, torn=reader.torn)
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Shared memory frame ring cross-process integrity check")
+    parser.add_argument('--duration', type=float, default=5.0)
+    parser.add_argument('--slots', type=int, default=2)
+    parser.add_argument('--name', default='inspire_hand_check')
+    args = parser.parse_args()
+
+    result = check_integrity(args.duration, args.slots, args.name)
+    print(' '.join(f"{key}={value}" for key, value in result.items()))
+    if result['bad'] or result['missed']:
+        raise SystemExit("frame ring integrity check failed")
+
+
+if __name__ == "__main__":
+    main()
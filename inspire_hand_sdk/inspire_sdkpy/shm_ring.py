@@ -0,0 +1,304 @@
+from .register_map import get_register_map
+from .inspire_hand_defaut import data_sheet
+
+from multiprocessing import shared_memory, resource_tracker
+import numpy as np
+import atexit
+import os
+import time
+import zlib
+
+SHM_MAGIC = 0x494E5348    # "INSH"
+SHM_VERSION = 2
+
+# 头部 (uint64): magic, version, 槽位数, 触觉点数, 状态数, 槽位字节数, 已写入帧数, 写入进程 pid
+HEADER_FIELDS = 8
+MAGIC, VERSION, SLOTS, TAXELS, STATES, SLOT_BYTES, COUNT, PID = range(8)
+HEADER_BYTES = HEADER_FIELDS * 8
+
+# 槽位元数据 (int64): seqlock 序号 (写入中为奇数), 帧序号, 区域有效位, 采集开始/结束时间 (monotonic ns), 校验和
+META_FIELDS = 8
+LOCK, SEQ, VALID, ACQ_START_NS, ACQ_END_NS, CHECKSUM = range(6)
+
+# 状态按 state_groups 顺序存放, 每类 6 个自由度
+STATE_ATTRS = ('pos_act', 'angle_act', 'force_act', 'current', 'err', 'status', 'temperature')
+STATE_NAMES = ('POS_ACT', 'ANGLE_ACT', 'FORCE_ACT', 'CURRENT', 'ERROR', 'STATUS', 'TEMP')
+NUM_STATES = 6 * len(STATE_ATTRS)
+
+
+def slot_bytes(num_taxels, num_states=NUM_STATES):
+    """Bytes of one slot: metadata, int16 taxels and int16 states, padded to a 64 byte cache line."""
+    size = META_FIELDS * 8 + 2 * (num_taxels + num_states)
+    return (size + 63) // 64 * 64
+
+
+def attach_shared_memory(name):
+    """Open an existing segment without registering it with resource_tracker, which would unlink it when this process exits."""
+    try:
+        return shared_memory.SharedMemory(name, track=False)
+    except TypeError:
+        # Python < 3.13 没有 track 参数: 打开时临时跳过登记
+        register = resource_tracker.register
+        resource_tracker.register = lambda name, rtype: None
+        try:
+            return shared_memory.SharedMemory(name)
+        finally:
+            resource_tracker.register = register
+
+
+def process_alive(pid):
+    """True while process `pid` exists on this host."""
+    if pid <= 0:
+        return False
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True    # 其他用户的进程
+    return True
+
+
+def ring_owner(name):
+    """pid of the writer that created ring `name`, None when the segment is not an inspire frame ring."""
+    shm = attach_shared_memory(name)
+    try:
+        if shm.size < HEADER_BYTES:
+            return None
+        header = np.ndarray(HEADER_FIELDS, dtype=np.uint64, buffer=shm.buf)
+        owner = int(header[PID]) if header[MAGIC] == SHM_MAGIC else None
+        del header
+        return owner
+    finally:
+        shm.close()
+
+
+def frame_checksum(lock, fields, payload):
+    """CRC32 of a slot: the final (even) lock word, meta[SEQ:CHECKSUM] and the taxel + state bytes."""
+    return zlib.crc32(payload, zlib.crc32(np.int64(lock).tobytes() + fields.tobytes()))
+
+
+class _SlotArrays:
+    def __init__(self, buf, slots, num_taxels, num_states, size):
+        # 每个槽位的元数据/触觉/状态数组, 直接映射共享内存
+        self.meta = [np.ndarray(META_FIELDS, dtype=np.int64, buffer=buf, offset=HEADER_BYTES + i * size) for i in range(slots)]
+        self.taxels = [np.ndarray(num_taxels, dtype=np.int16, buffer=buf, offset=HEADER_BYTES + i * size + META_FIELDS * 8) for i in range(slots)]
+        self.states = [np.ndarray(num_states, dtype=np.int16, buffer=buf,
+                                  offset=HEADER_BYTES + i * size + META_FIELDS * 8 + 2 * num_taxels) for i in range(slots)]
+        # 触觉 + 状态的原始字节, 用于校验和
+        self.payload = [np.ndarray(2 * (num_taxels + num_states), dtype=np.uint8, buffer=buf,
+                                   offset=HEADER_BYTES + i * size + META_FIELDS * 8) for i in range(slots)]
+
+
+class ShmFrameWriter:
+    def __init__(self, name, register_map=None, slots=16):
+        """_summary_
+        Single writer of a shared memory frame ring for consumers on the same host. Every slot holds one frame
+        (sequence number, region-valid mask, acquisition times, all taxels in definition order and the 42 state
+        values) and is guarded by a seqlock: its lock word is odd while the frame is written, readers retry
+        when it changed during their copy. The seqlock alone relies on x86 store/load order, so every slot also
+        carries a CRC32 of its frame and final lock word: readers retry on a mismatch, which catches torn copies
+        on weakly ordered CPUs (ARM) too. The segment is unlinked by close(), also called at exit.
+        Args:
+            name (str): Shared memory name, e.g. 'inspire_hand_r' (/dev/shm/inspire_hand_r).
+            register_map (RegisterMap, optional): Tactile register definition of the frames. Defaults to get_register_map(data_sheet).
+            slots (int, optional): Frames kept in the ring. Defaults to 16.
+        Raises:
+            FileExistsError: the ring is held by a running writer (another driver with the same LR), or the name is
+                taken by a segment that is not a frame ring. A ring left behind by a writer that died is replaced.
+        """
+        self.name = name
+        self.register_map = get_register_map(data_sheet) if register_map is None else register_map
+        self.slots = slots
+        self.num_taxels = self.register_map.num_taxels
+        self.slot_bytes = slot_bytes(self.num_taxels)
+        size = HEADER_BYTES + slots * self.slot_bytes
+        try:
+            self.shm = shared_memory.SharedMemory(name, create=True, size=size)
+        except FileExistsError:
+            # 同名共享内存: 写入进程仍在运行时拒绝启动, 否则为上一次运行未清理的, 替换
+            owner = ring_owner(name)
+            if owner is None:
+                raise FileExistsError(f"shared memory {name} exists and is not an inspire frame ring")
+            if process_alive(owner):
+                raise FileExistsError(f"shared memory {name} is in use by the writer process {owner}")
+            print(f"[ShmFrameWriter] replacing {name} left by the exited process {owner}")
+            stale = shared_memory.SharedMemory(name)
+            stale.close()
+            stale.unlink()
+            self.shm = shared_memory.SharedMemory(name, create=True, size=size)
+        self.header = np.ndarray(HEADER_FIELDS, dtype=np.uint64, buffer=self.shm.buf)
+        self.header[:] = 0
+        self.arrays = _SlotArrays(self.shm.buf, slots, self.num_taxels, NUM_STATES, self.slot_bytes)
+        self.header[[MAGIC, VERSION, SLOTS, TAXELS, STATES, SLOT_BYTES, PID]] = [SHM_MAGIC, SHM_VERSION, slots, self.num_taxels, NUM_STATES, self.slot_bytes, os.getpid()]
+        self.count = 0
+        self.closed = False
+        atexit.register(self.close)
+
+    def write(self, seq, acq_start_ns, acq_end_ns, registers=None, valid=0, states_msg=None):
+        """_summary_
+        Publish one frame into the next slot.
+        Args:
+            seq (int): Frame sequence number of the driver.
+            acq_start_ns (int): time.monotonic_ns() before the first request of the frame.
+            acq_end_ns (int): time.monotonic_ns() after the last request of the frame.
+            registers (np.ndarray, optional): Tactile register buffer read with register_map.plan. Defaults to None, taxels left as they are.
+            valid (int, optional): Region-valid bitmask, see RegisterMap.valid_mask. Defaults to 0.
+            states_msg (inspire_hand_state, optional): Decoded states. Defaults to None, states left as they are.
+        """
+        index = self.count % self.slots
+        meta = self.arrays.meta[index]
+        meta[LOCK] = 2 * self.count + 1
+        if registers is not None:
+            taxels = self.arrays.taxels[index].view(np.uint16)
+            layout = self.register_map.layout
+            taxels[:] = registers if layout is None else np.asarray(registers, dtype=np.uint16)[layout]
+        if states_msg is not None:
+            states = self.arrays.states[index]
+            for i, attr in enumerate(STATE_ATTRS):
+                states[6 * i:6 * i + 6] = getattr(states_msg, attr)
+        meta[SEQ] = seq
+        meta[VALID] = valid
+        meta[ACQ_START_NS] = acq_start_ns
+        meta[ACQ_END_NS] = acq_end_ns
+        meta[CHECKSUM] = frame_checksum(2 * self.count + 2, meta[SEQ:CHECKSUM], self.arrays.payload[index])
+        meta[LOCK] = 2 * self.count + 2
+        self.count += 1
+        self.header[COUNT] = self.count
+
+    def close(self):
+        if self.closed:
+            return
+        self.closed = True
+        del self.header, self.arrays
+        self.shm.close()
+        try:
+            self.shm.unlink()
+        except FileNotFoundError:
+            pass
+
+
+class ShmFrame:
+    def __init__(self, count, slot, lock, seq, valid, acq_start_ns, acq_end_ns, taxels, states, register_map):
+        """One frame of the ring, taxels/states are copies or, from latest(copy=False), views into shared memory."""
+        self.count = count
+        self.slot = slot
+        self.lock = lock
+        self.seq = seq
+        self.valid = valid
+        self.acq_start_ns = acq_start_ns
+        self.acq_end_ns = acq_end_ns
+        self.taxels = taxels
+        self.states = states
+        self.register_map = register_map
+
+    @property
+    def touch(self):
+        """var -> matrix views of the valid regions."""
+        return self.register_map.views(self.taxels, self.valid)
+
+    def states_dict(self):
+        """States keyed like get_states_dict / TimeSeriesRing state_groups."""
+        return {name: self.states[6 * i:6 * i + 6] for i, name in enumerate(STATE_NAMES)}
+
+
+class ShmFrameReader:
+    def __init__(self, name, register_map=None):
+        """_summary_
+        Reader of a ShmFrameWriter ring, any number per host. Reads never block the writer: a frame is
+        returned only when the slot's seqlock word was even and unchanged around the copy and the copy matches
+        the slot's checksum. `retries` counts copies dropped by the seqlock, `torn` those only the checksum caught.
+        Args:
+            name (str): Shared memory name given to the writer, e.g. 'inspire_hand_r'.
+            register_map (RegisterMap, optional): Must match the writer's. Defaults to get_register_map(data_sheet).
+        Raises:
+            FileNotFoundError: no writer created the ring
+            ValueError: the segment is not a frame ring of this layout
+        """
+        self.name = name
+        self.register_map = get_register_map(data_sheet) if register_map is None else register_map
+        self.shm = attach_shared_memory(name)
+        self.header = np.ndarray(HEADER_FIELDS, dtype=np.uint64, buffer=self.shm.buf)
+        if self.header[MAGIC] != SHM_MAGIC or self.header[VERSION] != SHM_VERSION \
+                or self.header[TAXELS] != self.register_map.num_taxels or self.header[STATES] != NUM_STATES:
+            self.close()
+            raise ValueError(f"{name} is not an inspire frame ring of {self.register_map.num_taxels} taxels")
+        self.slots = int(self.header[SLOTS])
+        self.arrays = _SlotArrays(self.shm.buf, self.slots, self.register_map.num_taxels, NUM_STATES, int(self.header[SLOT_BYTES]))
+        self.num_taxels = self.register_map.num_taxels
+        self.last_count = 0
+        self.retries = 0
+        self.torn = 0
+
+    @property
+    def count(self):
+        """Frames written so far."""
+        return int(self.header[COUNT])
+
+    def latest(self, copy=True):
+        """_summary_
+        Newest complete frame.
+        Args:
+            copy (bool, optional): Copy taxels/states out of shared memory. With False they are zero-copy views
+                that the writer overwrites after `slots` frames: the checksum only covers them when latest()
+                returns, check is_valid(frame) after using them. Defaults to True.
+        Returns:
+            ShmFrame: the frame, or None before the first one
+        """
+        while True:
+            count = self.count
+            if count == 0:
+                return None
+            slot = (count - 1) % self.slots
+            meta = self.arrays.meta[slot]
+            lock = int(meta[LOCK])
+            if lock != 2 * count:
+                self.retries += 1     # 槽位正被下一轮覆盖
+                continue
+            fields = meta[SEQ:CHECKSUM + 1].copy()
+            payload = self.arrays.payload[slot]
+            if copy:
+                payload = payload.copy()
+            if int(meta[LOCK]) != lock:
+                self.retries += 1
+                continue
+            # 弱内存序 CPU 上锁字可能先于数据可见: 以校验和确认拷贝完整
+            if frame_checksum(lock, fields[:-1], payload) != fields[-1]:
+                self.torn += 1
+                continue
+            seq, valid, acq_start_ns, acq_end_ns = (int(value) for value in fields[:-1])
+            if copy:
+                values = payload.view(np.int16)
+                taxels, states = values[:self.num_taxels], values[self.num_taxels:]
+            else:
+                taxels, states = self.arrays.taxels[slot], self.arrays.states[slot]
+            self.last_count = count
+            return ShmFrame(count, slot, lock, seq, valid, acq_start_ns, acq_end_ns, taxels, states, self.register_map)
+
+    def is_valid(self, frame):
+        """True while the slot of a zero-copy frame has not been rewritten."""
+        return int(self.arrays.meta[frame.slot][LOCK]) == frame.lock
+
+    def wait(self, timeout=None, poll=0.0005):
+        """Newest frame after the last one returned, polling every `poll` seconds. None on timeout."""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while self.count <= self.last_count:
+            if deadline is not None and time.monotonic() >= deadline:
+                return None
+            time.sleep(poll)
+        return self.latest()
+
+    def read(self):
+        """Drop-in for handler.read() (e.g. as MainWindow data_handler): {'states', 'touch'} of the newest frame, None before the first one.
+        Like handler.read(), touch holds every region: regions not read this frame (touch_divisors, failed requests) keep their last values."""
+        frame = self.latest()
+        if frame is None:
+            return None
+        touch = self.register_map.views(frame.taxels)
+        return {'states': {name: values.tolist() for name, values in frame.states_dict().items()}, 'touch': touch}
+
+    def close(self):
+        """Unmap the ring, zero-copy frames must not be used (or held) any more."""
+        self.header = self.arrays = None
+        self.shm.close()
+
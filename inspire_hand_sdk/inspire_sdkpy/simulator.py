@@ -0,0 +1,387 @@
+from .inspire_hand_defaut import data_sheet, baud_rates
+from .rtu import crc16
+
+import numpy as np
+import argparse
+import os
+import random
+import select
+import socketserver
+import struct
+import termios
+import threading
+import time
+import tty
+
+READ_HOLDING_REGISTERS = 0x03
+WRITE_SINGLE_REGISTER = 0x06
+WRITE_MULTIPLE_REGISTERS = 0x10
+
+ILLEGAL_FUNCTION = 0x01
+ILLEGAL_DATA_ADDRESS = 0x02
+ILLEGAL_DATA_VALUE = 0x03
+SLAVE_DEVICE_FAILURE = 0x04
+
+CONFIG_RANGE = (1000, 1704)   # 配置/控制/状态寄存器, 含 1700 ip
+TOUCH_RANGE = (3000, 5124)    # 触觉数据
+MEMORY_SIZE = TOUCH_RANGE[1]
+
+contact_patterns = ('blobs', 'press', 'noise', 'none')
+
+
+class SimulatedHand:
+    def __init__(self, device_id=1, data=data_sheet, contact='blobs', baudrate=115200, ip='192.168.11.210',
+                 latency=0.0, jitter=0.0, faults=None, seed=None):
+        """_summary_
+        Register level model of one hand. Memory is byte addressed like the real hand, every 16 bit register
+        occupies two addresses (high byte first). Finger angles follow the angle/position set registers at the
+        commanded speed, force/current/status are derived from the motion and the tactile regions of data
+        show a synthetic contact pattern.
+        Args:
+            device_id (int, optional): Hand ID (HAND_ID register 1000 and Modbus unit id). Defaults to 1.
+            data (list, optional): Tactile sensor register definition. Defaults to data_sheet.
+            contact (str, optional): One of contact_patterns: moving 'blobs', 'press' (grows as the hand closes), 'noise' or 'none'. Defaults to 'blobs'.
+            baudrate (int, optional): RS-485 baud rate stored in REDU_RATIO, the RTU simulator only answers at this rate. Defaults to 115200.
+            ip (str, optional): Value of the ip registers (1700). Defaults to '192.168.11.210'.
+            latency (float, optional): Processing time of every request in seconds. Defaults to 0.0.
+            jitter (float, optional): Extra uniformly distributed random latency in seconds. Defaults to 0.0.
+            faults (dict, optional): Probability per request of 'exception' (slave device failure response),
+                'drop' (no response, client times out) and 'corrupt' (RTU frame with a bad CRC). Defaults to None.
+            seed (int, optional): Random seed for jitter, faults and noise. Defaults to None.
+        """
+        self.device_id = device_id
+        self.data = data
+        self.contact = contact
+        self.latency = latency
+        self.jitter = jitter
+        self.faults = faults or {}
+        self.random = random.Random(seed)
+        self.noise = np.random.default_rng(seed)
+        self.lock = threading.Lock()
+        self.memory = bytearray(MEMORY_SIZE)
+        self.requests = 0
+
+        self.set_registers(1000, [device_id])
+        self.set_registers(1002, [{value: key for key, value in baud_rates.items()}[baudrate]])
+        self.set_registers(1032, [1000] * 6)      # DEFAULT_SPEED_SET
+        self.set_registers(1044, [1000] * 6)      # DEFAULT_FORCE_SET
+        octets = [int(part) for part in ip.split('.')]
+        self.set_registers(1700, [octets[1] << 8 | octets[0], octets[3] << 8 | octets[2]])
+        self.set_registers(1486, [1000] * 6)      # angle_set: 张开
+        self.set_registers(1498, [1000] * 6)      # force_set
+        self.set_registers(1522, [1000] * 6)      # speed_set
+
+        self.angle = np.full(6, 1000.0)
+        self.target = np.full(6, 1000.0)
+        self._last_update = time.monotonic()
+        self._start = self._last_update
+
+        # 每个触觉区域的网格坐标, 用于生成接触图案
+        self.regions = []
+        for index, (name, addr, length, size, var) in enumerate(data):
+            rows, cols = size
+            grid = np.mgrid[0:rows, 0:cols].astype(np.float64)
+            self.regions.append((addr, length, rows, cols, grid, index))
+
+    @property
+    def baudrate(self):
+        return baud_rates.get(self.get_registers(1002, 1)[0], 115200)
+
+    def get_registers(self, start_address, count):
+        return np.frombuffer(self.memory, dtype='>u2', count=count, offset=start_address).astype(np.int64)
+
+    def set_registers(self, start_address, values):
+        self.memory[start_address:start_address + 2 * len(values)] = np.asarray(values, dtype=np.int64).astype('>u2').tobytes()
+
+    def handle_pdu(self, pdu):
+        """_summary_
+        Serve one Modbus request PDU (function code + data).
+        Returns:
+            bytes: response PDU, or None when the request is dropped by fault injection.
+        """
+        delay = self.latency + (self.random.uniform(0.0, self.jitter) if self.jitter > 0 else 0.0)
+        if delay > 0:
+            time.sleep(delay)
+        if self.random.random() < self.faults.get('drop', 0.0):
+            return None
+        function = pdu[0]
+        if self.random.random() < self.faults.get('exception', 0.0):
+            return bytes([function | 0x80, SLAVE_DEVICE_FAILURE])
+        with self.lock:
+            self.requests += 1
+            try:
+                return self._dispatch(function, pdu)
+            except (struct.error, IndexError):
+                return bytes([function | 0x80, ILLEGAL_DATA_VALUE])
+
+    def _dispatch(self, function, pdu):
+        if function == READ_HOLDING_REGISTERS:
+            start_address, count = struct.unpack('>HH', pdu[1:5])
+            if not 1 <= count <= 125 or not self._valid(start_address, count):
+                return bytes([function | 0x80, ILLEGAL_DATA_ADDRESS])
+            self.update(start_address < TOUCH_RANGE[1] and start_address + 2 * count > TOUCH_RANGE[0])
+            return bytes([function, 2 * count]) + bytes(self.memory[start_address:start_address + 2 * count])
+        if function == WRITE_SINGLE_REGISTER:
+            start_address, value = struct.unpack('>HH', pdu[1:5])
+            if not self._valid(start_address, 1):
+                return bytes([function | 0x80, ILLEGAL_DATA_ADDRESS])
+            self.write(start_address, [value])
+            return bytes(pdu[:5])
+        if function == WRITE_MULTIPLE_REGISTERS:
+            start_address, count, byte_count = struct.unpack('>HHB', pdu[1:6])
+            if not 1 <= count <= 123 or byte_count != 2 * count or not self._valid(start_address, count):
+                return bytes([function | 0x80, ILLEGAL_DATA_ADDRESS])
+            self.write(start_address, list(struct.unpack('>%dH' % count, pdu[6:6 + byte_count])))
+            return bytes(pdu[:5])
+        return bytes([function | 0x80, ILLEGAL_FUNCTION])
+
+    def _valid(self, start_address, count):
+        end_address = start_address + 2 * count
+        return any(low <= start_address and end_address <= high for low, high in (CONFIG_RANGE, TOUCH_RANGE))
+
+    def write(self, start_address, values):
+        self.update(False)
+        self.set_registers(start_address, values)
+        end_address = start_address + 2 * len(values)
+        for finger in range(6):
+            # 跟随本次写入的角度/位置目标, -1 (0xFFFF) 表示该自由度不动作
+            pos_address, angle_address = 1474 + 2 * finger, 1486 + 2 * finger
+            if start_address <= angle_address < end_address:
+                angle = self.get_registers(angle_address, 1)[0]
+                if angle != 0xFFFF:
+                    self.target[finger] = min(angle, 1000)
+            elif start_address <= pos_address < end_address:
+                pos = self.get_registers(pos_address, 1)[0]
+                if pos != 0xFFFF:
+                    self.target[finger] = 1000 - min(pos, 2000) / 2
+        if start_address <= 1004 < end_address:
+            self.memory[1606:1612] = bytes(6)      # 清除错误
+        if start_address <= 1006 < end_address and self.memory[1006]:
+            self.target[:] = 1000                 # 恢复出厂设置: 张开
+
+    def update(self, touch=True):
+        """Advance the finger motion to now and refresh the state registers (and the tactile ones if touch)."""
+        now = time.monotonic()
+        dt = min(now - self._last_update, 0.1)
+        self._last_update = now
+        speed = np.clip(self.get_registers(1522, 6), 1, 1000) * 2.0       # 单位/秒, 速度 1000 约 0.5 秒全行程
+        previous = self.angle.copy()
+        step = np.clip(self.target - self.angle, -speed * dt, speed * dt)
+        self.angle += step
+        velocity = np.abs(self.angle - previous) / dt if dt > 0 else np.zeros(6)
+
+        closure = (1000.0 - self.angle) / 1000.0
+        force_set = np.clip(self.get_registers(1498, 6), 0, 3000)
+        force = np.minimum(closure * 1500.0, force_set)
+        status = np.where(self.angle == self.target, 2, np.where(step < 0, 1, 0))
+        status = np.where((force >= force_set) & (force_set > 0) & (step <= 0), 3, status)
+
+        self.set_registers(1534, np.round((1000.0 - self.angle) * 2))          # pos_act
+        self.set_registers(1546, np.round(self.angle))                         # angle_act
+        self.set_registers(1582, np.round(force))                              # force_act
+        self.set_registers(1594, np.round(100 + velocity * 0.2 + force * 0.25))  # current
+        self.memory[1612:1618] = bytes(status.astype(np.uint8))               # status
+        self.memory[1618:1624] = bytes((35 + 5 * closure).astype(np.uint8))  # temperature
+        if touch:
+            self.update_touch(now - self._start, closure)
+
+    def update_touch(self, t, closure):
+        for addr, length, rows, cols, grid, index in self.regions:
+            if self.contact == 'none':
+                values = np.zeros((rows, cols))
+            elif self.contact == 'noise':
+                values = self.noise.integers(0, 50, (rows, cols))
+            else:
+                phase = t * 2.0 + index
+                center_row = (rows - 1) * (0.5 + 0.4 * np.sin(phase))
+                center_col = (cols - 1) * (0.5 + 0.4 * np.cos(phase * 0.7))
+                sigma = max(rows, cols) / 4.0
+                amplitude = 4095.0 * (closure[min(index // 3, 5)] if self.contact == 'press' else 0.5 + 0.5 * np.sin(t + index))
+                values = amplitude * np.exp(-((grid[0] - center_row) ** 2 + (grid[1] - center_col) ** 2) / (2 * sigma ** 2))
+            self.memory[addr:addr + length] = np.clip(values, 0, 4095).astype('>u2').tobytes()
+
+
+def _inject_corruption(hand, frame):
+    if hand.random.random() < hand.faults.get('corrupt', 0.0):
+        return frame[:-1] + bytes([frame[-1] ^ 0xFF])
+    return frame
+
+
+class _TcpHandler(socketserver.BaseRequestHandler):
+    def handle(self):
+        stream = self.request.makefile('rb')
+        while True:
+            header = stream.read(7)
+            if len(header) < 7:
+                return
+            tid, protocol_id, length, unit_id = struct.unpack('>HHHB', header)
+            pdu = stream.read(length - 1)
+            hand = self.server.simulator.hand_for(unit_id)
+            if hand is None:
+                continue
+            response = hand.handle_pdu(pdu)
+            if response is None:
+                continue
+            self.request.sendall(struct.pack('>HHHB', tid, 0, len(response) + 1, unit_id) + response)
+
+
+class _ThreadingTcpServer(socketserver.ThreadingMixIn, socketserver.TCPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+
+class ModbusTcpSimulator:
+    def __init__(self, hands, host='127.0.0.1', port=6000):
+        """_summary_
+        Modbus TCP server for one or more SimulatedHand. A single hand answers every unit id, like the real
+        hand, several hands are selected by unit id. For ModbusDataHandlerDouble with ip=[ip_l, ip_r] start one
+        simulator per hand on e.g. 127.0.0.1 and 127.0.0.2 with the same port.
+        Args:
+            hands (SimulatedHand | list): Simulated hand(s).
+            host (str, optional): Address to listen on. Defaults to '127.0.0.1'.
+            port (int, optional): Port, 0 picks a free one. Defaults to 6000.
+        """
+        self.hands = {hand.device_id: hand for hand in (hands if isinstance(hands, (list, tuple)) else [hands])}
+        self.server = _ThreadingTcpServer((host, port), _TcpHandler)
+        self.server.simulator = self
+        self.thread = None
+
+    @property
+    def address(self):
+        return self.server.server_address
+
+    def hand_for(self, unit_id):
+        if len(self.hands) == 1:
+            return next(iter(self.hands.values()))
+        return self.hands.get(unit_id)
+
+    def start(self):
+        self.thread = threading.Thread(target=self.server.serve_forever, name="inspire_sim_tcp", daemon=True)
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+class ModbusRtuSimulator:
+    termios_baud_rates = {getattr(termios, 'B%d' % rate): rate for rate in (9600, 19200, 38400, 57600, 115200, 230400, 460800, 921600)
+                          if hasattr(termios, 'B%d' % rate)}
+
+    def __init__(self, hands, emulate_line_rate=True):
+        """_summary_
+        Modbus RTU slave(s) on a pseudo-terminal, open self.port (e.g. /dev/pts/3) with ModbusSerialClient.
+        Hands on the same pty form a daisy chain addressed by unit id, unknown ids get no answer like on a
+        real RS-485 bus. A hand only answers when the port is opened at its baud rate.
+        Args:
+            hands (SimulatedHand | list): Simulated hand(s) on the bus.
+            emulate_line_rate (bool, optional): Delay responses by their transmission time at the line baud rate. Defaults to True.
+        """
+        self.hands = {hand.device_id: hand for hand in (hands if isinstance(hands, (list, tuple)) else [hands])}
+        self.emulate_line_rate = emulate_line_rate
+        self.master, self.slave = os.openpty()
+        tty.setraw(self.master)
+        self.port = os.ttyname(self.slave)
+        self._quit = threading.Event()
+        self.thread = None
+
+    def line_baudrate(self):
+        """Baud rate the client configured on the port, None if unknown."""
+        try:
+            return self.termios_baud_rates.get(termios.tcgetattr(self.slave)[4])
+        except termios.error:
+            return None
+
+    def start(self):
+        self.thread = threading.Thread(target=self._run, name="inspire_sim_rtu", daemon=True)
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self._quit.set()
+        if self.thread is not None:
+            self.thread.join(1.0)
+        os.close(self.master)
+        os.close(self.slave)
+
+    def _run(self):
+        buffer = b''
+        while not self._quit.is_set():
+            readable, _, _ = select.select([self.master], [], [], 0.05)
+            if not readable:
+                buffer = b''    # 帧间静默: 丢弃不完整的帧
+                continue
+            buffer += os.read(self.master, 1024)
+            while True:
+                length = self._frame_length(buffer)
+                if length is None or len(buffer) < length:
+                    break
+                frame, buffer = buffer[:length], buffer[length:]
+                self._serve(frame)
+
+    @staticmethod
+    def _frame_length(buffer):
+        if len(buffer) < 2:
+            return None
+        if buffer[1] in (READ_HOLDING_REGISTERS, WRITE_SINGLE_REGISTER):
+            return 8
+        if buffer[1] == WRITE_MULTIPLE_REGISTERS:
+            return 9 + buffer[6] if len(buffer) >= 7 else None
+        return len(buffer)
+
+    def _serve(self, frame):
+        if crc16(frame[:-2]) != frame[-2:]:
+            return
+        hand = self.hands.get(frame[0])
+        if hand is None:
+            return
+        line_baudrate = self.line_baudrate()
+        if line_baudrate is not None and line_baudrate != hand.baudrate:
+            return
+        response = hand.handle_pdu(frame[1:-2])
+        if response is None:
+            return
+        response = bytes([frame[0]]) + response
+        response = _inject_corruption(hand, response + crc16(response))
+        if self.emulate_line_rate:
+            time.sleep(10.0 * (len(frame) + len(response)) / (line_baudrate or hand.baudrate))
+        os.write(self.master, response)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Inspire hand Modbus simulator")
+    parser.add_argument('--tcp', type=int, default=None, help="serve Modbus TCP on this port")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--rtu', action='store_true', help="serve Modbus RTU on a pseudo-terminal")
+    parser.add_argument('--ids', type=int, nargs='+', default=[1], help="hand ids")
+    parser.add_argument('--baudrate', type=int, default=115200, choices=sorted(baud_rates.values()))
+    parser.add_argument('--contact', default='blobs', choices=contact_patterns)
+    parser.add_argument('--latency', type=float, default=0.0)
+    parser.add_argument('--jitter', type=float, default=0.0)
+    parser.add_argument('--exception-rate', type=float, default=0.0)
+    parser.add_argument('--drop-rate', type=float, default=0.0)
+    parser.add_argument('--corrupt-rate', type=float, default=0.0)
+    parser.add_argument('--seed', type=int, default=None)
+    args = parser.parse_args()
+
+    faults = {'exception': args.exception_rate, 'drop': args.drop_rate, 'corrupt': args.corrupt_rate}
+    hands = [SimulatedHand(device_id, contact=args.contact, baudrate=args.baudrate, latency=args.latency,
+                           jitter=args.jitter, faults=faults, seed=args.seed) for device_id in args.ids]
+    simulators = []
+    if args.tcp is not None or not args.rtu:
+        simulators.append(ModbusTcpSimulator(hands, args.host, 6000 if args.tcp is None else args.tcp).start())
+        print(f"Modbus TCP simulator on {args.host}:{simulators[-1].address[1]}, ids {args.ids}")
+    if args.rtu:
+        simulators.append(ModbusRtuSimulator(hands).start())
+        print(f"Modbus RTU simulator on {simulators[-1].port} at {args.baudrate}, ids {args.ids}")
+    try:
+        while True:
+            time.sleep(1.0)
+    except KeyboardInterrupt:
+        for simulator in simulators:
+            simulator.stop()
+
+
+if __name__ == "__main__":
+    main()
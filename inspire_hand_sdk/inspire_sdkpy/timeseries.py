@@ -0,0 +1,93 @@
+import numpy as np
+import time
+
+# 手部状态的 7 类数据, 每类 6 个自由度, 与 get_states_dict 的键一致
+state_groups = {
+    'POS_ACT': 6,
+    'ANGLE_ACT': 6,
+    'FORCE_ACT': 6,
+    'CURRENT': 6,
+    'ERROR': 6,
+    'STATUS': 6,
+    'TEMP': 6,
+}
+
+
+class TimeSeriesRing:
+    def __init__(self, groups=state_groups, length=100, dtype=np.float32):
+        """_summary_
+        Preallocated channels x length ring buffer with timestamps. Every sample is written twice, at i and
+        i + length, so the newest `length` samples are always contiguous and every read is a zero-copy, time
+        ordered view instead of an np.roll copy. Views alias the buffer and change as new samples arrive,
+        .copy() them to keep a stable snapshot. One writer, any number of readers.
+        Args:
+            groups (dict, optional): group name -> number of channels. Defaults to state_groups (7 x 6 channels).
+            length (int, optional): Samples kept per channel, e.g. 200 Hz * 300 s = 60000 for five minutes. Defaults to 100.
+            dtype (np.dtype, optional): Sample type. Defaults to np.float32.
+        """
+        self.length = length
+        self.groups = {}
+        channels = 0
+        for name, count in groups.items():
+            self.groups[name] = slice(channels, channels + count)
+            channels += count
+        self.channels = channels
+        self._data = np.zeros((channels, 2 * length), dtype=dtype)
+        self._time = np.zeros(2 * length)
+        self.count = 0
+
+    def __len__(self):
+        return min(self.count, self.length)
+
+    def append(self, values, timestamp=None):
+        """_summary_
+        Append one sample of every channel.
+        Args:
+            values (dict | array): group name -> values of its channels (e.g. the 'states' dict of handler.read()),
+                or a flat array of all channels.
+            timestamp (float, optional): Sample time. Defaults to time.monotonic().
+        """
+        i = self.count % self.length
+        j = i + self.length
+        if isinstance(values, dict):
+            for name, group_values in values.items():
+                rows = self.groups.get(name)
+                if rows is not None and group_values is not None:
+                    self._data[rows, i] = group_values
+                    self._data[rows, j] = group_values
+        else:
+            self._data[:, i] = values
+            self._data[:, j] = values
+        self._time[i] = self._time[j] = time.monotonic() if timestamp is None else timestamp
+        self.count += 1
+
+    def _window(self, n=None):
+        available = len(self)
+        n = available if n is None else min(n, available)
+        end = self.count % self.length
+        end = end + self.length if self.count >= self.length else end
+        return slice(end - n, end)
+
+    def view(self, n=None):
+        """(channels, n) view of the newest n samples (default all kept samples), oldest first."""
+        return self._data[:, self._window(n)]
+
+    def times(self, n=None):
+        """Timestamps matching view(n)."""
+        return self._time[self._window(n)]
+
+    def group(self, name, n=None):
+        """(channels of group, n) view of one group, e.g. group('ANGLE_ACT')[finger]."""
+        return self._data[self.groups[name], self._window(n)]
+
+    def __getitem__(self, name):
+        return self.group(name)
+
+    def latest(self):
+        """Newest sample of every channel, or None when empty."""
+        if self.count == 0:
+            return None
+        return self._data[:, (self.count - 1) % self.length]
+
+    def clear(self):
+        self.count = 0
@@ -0,0 +1,96 @@
+from .read_plan import MAX_READ_REGISTERS, compile_read_plan
+from .register_map import RegisterMap
+
+from functools import reduce
+from math import lcm
+import numpy as np
+
+# RS-485 建议配置: 指端每帧, 指尖/大拇指指中每 2 帧, 指腹和掌心每 4 帧 (约为整帧触觉数据的 40%)
+SERIAL_TOUCH_DIVISORS = {'tip': 1, 'top': 2, 'middle': 2, 'palm': 4}
+
+
+def region_divisor(region, divisors):
+    """Divisor of one region: its var, else its finger, else its segment, else divisors.get('default', 1)."""
+    for key in (region.var, region.finger, region.segment, 'default'):
+        if key in divisors:
+            divisor = divisors[key]
+            if not isinstance(divisor, int) or divisor < 1:
+                raise ValueError(f"divisor of '{key}' must be a positive int, got {divisor!r}")
+            return divisor
+    return 1
+
+
+class TouchPhase:
+    def __init__(self, register_map, regions, max_registers=MAX_READ_REGISTERS):
+        """_summary_
+        The regions read in one frame of a TouchCycle: a read plan over just those regions and the index
+        that scatters its buffer into the full register_map.plan buffer.
+        Args:
+            register_map (RegisterMap): Full tactile register map.
+            regions (list): Regions due in this phase.
+            max_registers (int, optional): see compile_read_plan. Defaults to MAX_READ_REGISTERS.
+        """
+        self.vars = frozenset(region.var for region in regions)
+        self.skipped = frozenset(region.var for region in register_map if region.var not in self.vars)
+        if regions:
+            sub_map = RegisterMap([register_map.data[region.index] for region in regions], max_registers)
+            self.plan = sub_map.plan
+            self.src = np.concatenate([np.arange(sub.plan_offset, sub.plan_offset + sub.num_registers) for sub in sub_map])
+            self.dst = np.concatenate([np.arange(register_map[sub.var].plan_offset, register_map[sub.var].plan_offset + sub.num_registers)
+                                       for sub in sub_map])
+        else:
+            # 所有区域本帧都跳过 (全部分频都大于 1)
+            self.plan = compile_read_plan([], max_registers)
+            self.src = self.dst = np.zeros(0, dtype=np.intp)
+        self.buffers = {}
+
+    def buffer(self, hand=0):
+        """Reusable register buffer of this phase's plan, one per hand."""
+        if hand not in self.buffers:
+            self.buffers[hand] = np.zeros(self.plan.num_registers, dtype=np.uint16)
+        return self.buffers[hand]
+
+    def scatter(self, registers, missing, out):
+        """_summary_
+        Copy the registers read with self.plan into the full buffer `out`, regions not due keep their last values.
+        Returns:
+            tuple: (out, missing) with missing holding the failed and the skipped regions, as ReadPlan.execute
+        """
+        out[self.dst] = np.asarray(registers, dtype=np.uint16)[self.src]
+        return out, self.skipped.union(missing)
+
+
+class TouchCycle:
+    def __init__(self, register_map, divisors, max_registers=MAX_READ_REGISTERS):
+        """_summary_
+        Read every tactile region on every N-th frame only, e.g. fingertips each frame and the palm every 4th,
+        to fit the touch data into a slow link such as RS-485. The read plan of every phase is compiled once.
+        Args:
+            register_map (RegisterMap): Full tactile register map.
+            divisors (dict): key -> N, key is a region var ('palm_touch'), a finger ('fingerfive', 'palm'), a segment
+                ('tip', 'top', 'middle', 'palm') or 'default', the most specific key wins. Regions without a key are read every frame.
+            max_registers (int, optional): see compile_read_plan. Defaults to MAX_READ_REGISTERS.
+        """
+        self.register_map = register_map
+        self.divisors = {region.var: region_divisor(region, divisors) for region in register_map}
+        self.period = reduce(lcm, self.divisors.values(), 1)
+        phases = {}
+        self.phases = []
+        for frame in range(self.period):
+            due = [region for region in register_map if frame % self.divisors[region.var] == 0]
+            key = frozenset(region.var for region in due)
+            if key not in phases:
+                phases[key] = TouchPhase(register_map, due, max_registers)
+            self.phases.append(phases[key])
+
+    def phase(self, frame):
+        """Phase of frame number `frame` (e.g. the handler's sequence number)."""
+        return self.phases[frame % self.period]
+
+    def registers_per_frame(self):
+        """Average number of tactile registers read per frame."""
+        return sum(phase.plan.num_registers for phase in self.phases) / self.period
+
+    def requests_per_frame(self):
+        """Average number of Modbus requests per frame."""
+        return sum(len(phase.plan) for phase in self.phases) / self.period
@@ -1,6 +1,5 @@
-import time
 from typing import Any, Callable
-from threading import Thread, Event
+from threading import Thread, Event, Condition, Lock
 
 from cyclonedds.domain import Domain, DomainParticipant
 from cyclonedds.internal import dds_c_t
@@ -15,10 +14,16 @@ from cyclonedds.internal import dds_c_t, InvalidSample
 # for channel config
 from .channel_config import ChannelConfigAutoDetermine, ChannelConfigHasInterface
 
+# for qos presets
+from .channel_qos import GetChannelQos
+
 # for singleton
 from ..utils.singleton import Singleton
 from ..utils.bqueue import BQueue
 
+# max samples taken from the reader cache per take() call
+READER_TAKE_MAX = 32
+
 
 """
 " class ChannelReader
@@ -36,23 +41,37 @@ class Channel:
         def __init__(self):
             self.__reader = None
             self.__handler = None
+            self.__batch = False
+            self.__conflate = False
+            self.__superseded = 0
+            self.__takeLock = Lock()
             self.__queue = None
             self.__queueEnable = False
             self.__threadEvent = None
             self.__threadReader = None
+            self.__subscription_matched_count = 0
+            self.__matchedCondition = Condition()
         
-        def Init(self, participant: DomainParticipant, topic: Topic, qos: Qos = None, handler: Callable = None, queueLen: int = 0):
+        def Init(self, participant: DomainParticipant, topic: Topic, qos: Qos = None, handler: Callable = None, queueLen: int = 0, batch: bool = False, conflate: bool = False):
             if handler is None:
-                self.__reader = DataReader(participant, topic, qos)
+                self.__reader = DataReader(participant, topic, qos, Listener(on_subscription_matched=self.__OnSubscriptionMatched))
             else:
                 self.__handler = handler
-                if queueLen > 0:
+                self.__batch = batch
+                self.__conflate = conflate
+                if queueLen > 0 or conflate:
                     self.__queueEnable = True
-                    self.__queue = BQueue(queueLen)
+                    # conflate: keep only the latest sample, the handler thread always wakes on the freshest one
+                    self.__queue = BQueue(1 if conflate else queueLen)
                     self.__threadEvent = Event()
                     self.__threadReader = Thread(target=self.__ChannelReaderThreadFunc, name="ch_reader", daemon=True)
                     self.__threadReader.start()
-                self.__reader = DataReader(participant, topic, qos, Listener(on_data_available=self.__OnDataAvailable))
+                # set on_data_available once the reader is constructed: samples of an immediately writing
+                # publisher can arrive before DataReader.__init__ returns, take the ones already cached
+                # (__takeLock keeps this drain and a concurrent listener call from running the handler at once)
+                self.__reader = DataReader(participant, topic, qos, Listener(on_subscription_matched=self.__OnSubscriptionMatched))
+                self.__reader.set_listener(Listener(on_data_available=self.__OnDataAvailable))
+                self.__OnDataAvailable(self.__reader)
 
         def Read(self, timeout: float = None):
             sample = None
@@ -81,38 +100,73 @@ class Channel:
                 self.__threadReader.join()
 
         def __OnDataAvailable(self, reader: DataReader):
+            with self.__takeLock:
+                self.__TakeAvailable(reader)
+
+        def __TakeAvailable(self, reader: DataReader):
+            # drain all available samples in one wakeup
             samples = []
-            try:
-                samples = reader.take(1)
-            except DDSException as e:
-                print("[Reader] catch DDSException error. msg:", e.msg)
-                return
-            except TimeoutError as e:
-                print("[Reader] take sample timeout")
-                return
-            except:
-                print("[Reader] take sample error")
+            while True:
+                try:
+                    taken = reader.take(READER_TAKE_MAX)
+                except DDSException as e:
+                    print("[Reader] catch DDSException error. msg:", e.msg)
+                    break
+                except TimeoutError as e:
+                    print("[Reader] take sample timeout")
+                    break
+                except:
+                    print("[Reader] take sample error")
+                    break
+
+                if not taken:
+                    break
+
+                # check invalid sample
+                samples.extend(sample for sample in taken if not isinstance(sample, InvalidSample))
+
+                if len(taken) < READER_TAKE_MAX:
+                    break
+
+            if not samples:
                 return
 
-            if samples is None:
-                return
+            # do samples
+            if self.__conflate:
+                self.__superseded += len(samples) - 1
+                if not self.__queue.Put(samples[-1], True):
+                    self.__superseded += 1
+            elif self.__queueEnable:
+                for sample in samples:
+                    self.__queue.Put(sample)
+            elif self.__batch:
+                self.__handler(samples)
+            else:
+                for sample in samples:
+                    self.__handler(sample)
 
-            # check invalid sample        
-            sample = samples[0]
-            if isinstance(sample, InvalidSample):
-                return
+        def SupersededCount(self):
+            return self.__superseded
 
-            # do sample
-            if self.__queueEnable:
-                self.__queue.Put(sample)
-            else:
-                self.__handler(sample)
+        def WaitMatched(self, timeout: float = None):
+            with self.__matchedCondition:
+                return self.__matchedCondition.wait_for(lambda: self.__subscription_matched_count > 0, timeout)
+
+        def __OnSubscriptionMatched(self, reader: DataReader, status: dds_c_t.subscription_matched_status):
+            with self.__matchedCondition:
+                self.__subscription_matched_count = status.current_count
+                self.__matchedCondition.notify_all()
 
         def __ChannelReaderThreadFunc(self):
             while not self.__threadEvent.is_set():
-                sample = self.__queue.Get()
-                if sample is not None:
-                    self.__handler(sample)
+                if self.__batch:
+                    samples = self.__queue.GetAll()
+                    if samples:
+                        self.__handler(samples)
+                else:
+                    sample = self.__queue.Get()
+                    if sample is not None:
+                        self.__handler(sample)
 
     """
     " internal class __Writer
@@ -121,22 +175,24 @@ class Channel:
         def __init__(self):
             self.__writer = None
             self.__publication_matched_count = 0
+            self.__matchedCondition = Condition()
+            self.__dropUnmatched = False
         
-        def Init(self, participant: DomainParticipant, topic: Topic, qos: Qos = None):
+        def Init(self, participant: DomainParticipant, topic: Topic, qos: Qos = None, dropUnmatched: bool = False):
+            self.__dropUnmatched = dropUnmatched
             self.__writer = DataWriter(participant, topic, qos, Listener(on_publication_matched=self.__OnPublicationMatched))
-            time.sleep(0.2)
 
-        def Write(self, sample: Any, timeout: float = None):
-            waitsec = 0.0 if timeout is None else timeout
-
-            # check publication_matched_count
-            while waitsec > 0.0 and self.__publication_matched_count == 0:
-                time.sleep(0.1)
-                waitsec = waitsec - 0.1
-            #   print(time.time())
+        def WaitMatched(self, timeout: float = None):
+            with self.__matchedCondition:
+                return self.__matchedCondition.wait_for(lambda: self.__publication_matched_count > 0, timeout)
 
-            # check waitsec
-            if timeout is not None and waitsec <= 0.0:
+        def Write(self, sample: Any, timeout: float = None):
+            # drop unmatched: never wait or serialize when nobody is listening
+            if self.__dropUnmatched:
+                if self.__publication_matched_count == 0:
+                    return False
+            # wait publication matched, woken by __OnPublicationMatched
+            elif timeout is not None and not self.WaitMatched(timeout):
                 return False
 
             try:
@@ -145,7 +201,7 @@ class Channel:
                 print("[Writer] catch DDSException error. msg:", e.msg)
                 return False
             except Exception as e:
-                print("[Writer] write sample error. msg:", e.args())
+                print("[Writer] write sample error. msg:", e.args)
                 return False
 
             return True
@@ -155,7 +211,9 @@ class Channel:
                 del self.__writer
         
         def __OnPublicationMatched(self, writer: DataWriter, status: dds_c_t.publication_matched_status):
-            self.__publication_matched_count = status.current_count
+            with self.__matchedCondition:
+                self.__publication_matched_count = status.current_count
+                self.__matchedCondition.notify_all()
 
 
     # channel __init__
@@ -165,11 +223,12 @@ class Channel:
         self.__participant = participant
         self.__topic = Topic(self.__participant, name, type, qos)
 
-    def SetWriter(self, qos: Qos = None):
-        self.__writer.Init(self.__participant, self.__topic, qos)
+    # qos: Qos, ChannelQosPreset or preset name, see GetChannelQos
+    def SetWriter(self, qos: Qos = None, dropUnmatched: bool = False):
+        self.__writer.Init(self.__participant, self.__topic, GetChannelQos(qos), dropUnmatched)
 
-    def SetReader(self, qos: Qos = None, handler: Callable = None, queueLen: int = 0):
-        self.__reader.Init(self.__participant, self.__topic, qos, handler, queueLen)
+    def SetReader(self, qos: Qos = None, handler: Callable = None, queueLen: int = 0, batch: bool = False, conflate: bool = False):
+        self.__reader.Init(self.__participant, self.__topic, GetChannelQos(qos), handler, queueLen, batch, conflate)
         
     def Write(self, sample: Any, timeout: float = None):
         return self.__writer.Write(sample, timeout)
@@ -177,6 +236,15 @@ class Channel:
     def Read(self, timeout: float = None):
         return self.__reader.Read(timeout)
 
+    def SupersededCount(self):
+        return self.__reader.SupersededCount()
+
+    def WaitWriterMatched(self, timeout: float = None):
+        return self.__writer.WaitMatched(timeout)
+
+    def WaitReaderMatched(self, timeout: float = None):
+        return self.__reader.WaitMatched(timeout)
+
     def CloseReader(self):
         self.__reader.Close()
 
@@ -221,21 +289,21 @@ class ChannelFactory(Singleton):
             print("[ChannelFactory] create domain participant error")
             return False
 
-        self.__qos = qos
+        self.__qos = GetChannelQos(qos)
 
         return True
 
     def CreateChannel(self, name: str, type: Any):
         return Channel(self.__participant, name, type, self.__qos)
 
-    def CreateSendChannel(self, name: str, type: Any):
+    def CreateSendChannel(self, name: str, type: Any, qos: Qos = None, dropUnmatched: bool = False):
         channel = self.CreateChannel(name, type)
-        channel.SetWriter(None)
+        channel.SetWriter(qos, dropUnmatched)
         return channel
 
-    def CreateRecvChannel(self, name: str, type: Any, handler: Callable = None, queueLen: int = 0):
+    def CreateRecvChannel(self, name: str, type: Any, handler: Callable = None, queueLen: int = 0, batch: bool = False, conflate: bool = False, qos: Qos = None):
         channel = self.CreateChannel(name, type)
-        channel.SetReader(None, handler, queueLen)
+        channel.SetReader(qos, handler, queueLen, batch, conflate)
         return channel
 
 
@@ -243,14 +311,18 @@ class ChannelFactory(Singleton):
 " class ChannelPublisher
 """
 class ChannelPublisher:
-    def __init__(self, name: str, type: Any):
+    # qos: Qos, ChannelQosPreset or preset name (e.g. ChannelQosPreset.SENSOR_STREAM), None for DDS defaults
+    # dropUnmatched=True: Write returns False at once while no subscriber matched, whatever the timeout
+    def __init__(self, name: str, type: Any, qos: Qos = None, dropUnmatched: bool = False):
         factory = ChannelFactory()
         self.__channel = factory.CreateChannel(name, type)
+        self.__qos = qos
+        self.__dropUnmatched = dropUnmatched
         self.__inited = False
 
     def Init(self):
         if not self.__inited:
-            self.__channel.SetWriter(None)
+            self.__channel.SetWriter(self.__qos, self.__dropUnmatched)
             self.__inited = True
 
     def Close(self):
@@ -260,18 +332,26 @@ class ChannelPublisher:
     def Write(self, sample: Any, timeout: float = None):
         return self.__channel.Write(sample, timeout)
 
+    # wait until at least one subscriber matched, returns False on timeout
+    def WaitMatched(self, timeout: float = None):
+        return self.__channel.WaitWriterMatched(timeout)
+
 """
 " class ChannelSubscriber
 """
 class ChannelSubscriber:
-    def __init__(self, name: str, type: Any):
+    # qos: Qos, ChannelQosPreset or preset name, must be compatible with the publisher's
+    def __init__(self, name: str, type: Any, qos: Qos = None):
         factory = ChannelFactory()
         self.__channel = factory.CreateChannel(name, type)
+        self.__qos = qos
         self.__inited = False
 
-    def Init(self, handler: Callable = None, queueLen: int = 0):
+    # batch=True: handler(list_of_samples) is called once with all samples available per wakeup
+    # conflate=True: handler runs in its own thread on the latest sample only (queueLen ignored), see SupersededCount
+    def Init(self, handler: Callable = None, queueLen: int = 0, batch: bool = False, conflate: bool = False):
         if not self.__inited:
-            self.__channel.SetReader(None, handler, queueLen)
+            self.__channel.SetReader(self.__qos, handler, queueLen, batch, conflate)
             self.__inited = True
 
     def Close(self):
@@ -281,10 +361,18 @@ class ChannelSubscriber:
     def Read(self, timeout: int = None):
         return self.__channel.Read(timeout)
 
+    # number of samples replaced by a newer one before the conflating handler saw them
+    def SupersededCount(self):
+        return self.__channel.SupersededCount()
+
+    # wait until at least one publisher matched, returns False on timeout
+    def WaitMatched(self, timeout: float = None):
+        return self.__channel.WaitReaderMatched(timeout)
+
 """
 " function ChannelFactoryInitialize. used to intialize channel everenment.
 """
-def ChannelFactoryInitialize(id: int = 0, networkInterface: str = None):
+def ChannelFactoryInitialize(id: int = 0, networkInterface: str = None, qos: Qos = None):
     factory = ChannelFactory()
-    if not factory.Init(id, networkInterface):
+    if not factory.Init(id, networkInterface, qos):
         raise Exception("channel factory init error.")
@@ -0,0 +1,47 @@
+from enum import Enum
+from typing import Union
+
+from cyclonedds.qos import Qos, Policy
+from cyclonedds.util import duration
+
+# command preset: the reader expects a new command at least every COMMAND_DEADLINE seconds
+COMMAND_DEADLINE = 1.0
+# record preset: samples buffered per reader/writer before a reliable write blocks
+RECORD_MAX_SAMPLES = 1000
+
+"""
+" Enum ChannelQosPreset
+"""
+class ChannelQosPreset(Enum):
+    SENSOR_STREAM = "sensor_stream"   # best-effort, keep-last-1: high rate state/tactile streams
+    COMMAND = "command"               # reliable, keep-last-1, deadline: control commands
+    RECORD = "record"                 # reliable, keep-all, bounded: loggers/recorders that must not lose samples
+
+"""
+" function GetChannelQos
+" preset may be a ChannelQosPreset, its name ("sensor_stream", ...), a Qos (returned as is) or None (DDS defaults).
+" A reliable reader does not match a best-effort writer, use the same preset on both sides of a topic.
+"""
+def GetChannelQos(preset: Union[ChannelQosPreset, str, Qos, None]):
+    if preset is None or isinstance(preset, Qos):
+        return preset
+
+    preset = ChannelQosPreset(preset)
+
+    if preset == ChannelQosPreset.SENSOR_STREAM:
+        return Qos(
+            Policy.Reliability.BestEffort,
+            Policy.History.KeepLast(1)
+        )
+    elif preset == ChannelQosPreset.COMMAND:
+        return Qos(
+            Policy.Reliability.Reliable(duration(milliseconds=100)),
+            Policy.History.KeepLast(1),
+            Policy.Deadline(duration(seconds=COMMAND_DEADLINE))
+        )
+    else:
+        return Qos(
+            Policy.Reliability.Reliable(duration(seconds=1)),
+            Policy.History.KeepAll,
+            Policy.ResourceLimits(max_samples=RECORD_MAX_SAMPLES)
+        )
@@ -24,6 +24,9 @@ class ClientBase:
     def SetTimeout(self, timeout: float):
         self.__timeout = timeout
 
+    def WaitMatched(self, timeout: float = None):
+        return self.__stub.WaitMatched(timeout)
+
     def _CallBase(self, apiId: int, parameter: str, proirity: int = 0, leaseId: int = 0):
         # print("[CallBase] call apiId:", apiId, ", proirity:", proirity, ", leaseId:", leaseId)
         header = self.__SetHeader(apiId, leaseId, proirity, False)
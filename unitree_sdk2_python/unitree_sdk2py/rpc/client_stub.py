@@ -30,8 +30,14 @@ class ClientStub:
         self.__sendChannel = factory.CreateSendChannel(GetClientChannelName(self.__serviceName, ChannelType.SEND), Request)
         self.__recvChannel = factory.CreateRecvChannel(GetClientChannelName(self.__serviceName, ChannelType.RECV), Response,
                                     self.__ResponseHandler,10)
-        time.sleep(0.5)
 
+    # wait until the server's request reader and response writer matched, returns False on timeout
+    def WaitMatched(self, timeout: float = None):
+        start = time.monotonic()
+        if not self.__sendChannel.WaitWriterMatched(timeout):
+            return False
+        remaining = None if timeout is None else max(0.0, timeout - (time.monotonic() - start))
+        return self.__recvChannel.WaitReaderMatched(remaining)
 
     def Send(self, request: Request, timeout: float):
         if self.__sendChannel.Write(request, timeout):
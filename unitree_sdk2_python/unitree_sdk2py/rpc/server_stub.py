@@ -1,5 +1,3 @@
-import time
-
 from enum import Enum
 from threading import Thread, Condition
 from typing import Callable, Any
@@ -31,13 +29,7 @@ class ServerStub:
         self.__serverRquestHandler = serverRequestHander
         self.__enablePriority = enablePriority
 
-        factory = ChannelFactory()
-
-        # create channel
-        self.__sendChannel = factory.CreateSendChannel(GetServerChannelName(self.__serviceName, ChannelType.SEND), Response)
-        self.__recvChannel = factory.CreateRecvChannel(GetServerChannelName(self.__serviceName, ChannelType.RECV), Request, self.__Enqueue, 10)
-
-        # start priority request thread
+        # start priority request thread, before the request channel can deliver to __Enqueue
         self.__queue = BQueue(10)
         self.__queueThread = Thread(target=self.__QueueThreadFunc, name="server_queue", daemon=True)
         self.__queueThread.start()
@@ -47,8 +39,11 @@ class ServerStub:
             self.__prioQueueThread = Thread(target=self.__PrioQueueThreadFunc, name="server_prio_queue", daemon=True)
             self.__prioQueueThread.start()
 
-        # wait thread started
-        time.sleep(0.5)
+        factory = ChannelFactory()
+
+        # create channel
+        self.__sendChannel = factory.CreateSendChannel(GetServerChannelName(self.__serviceName, ChannelType.SEND), Response)
+        self.__recvChannel = factory.CreateRecvChannel(GetServerChannelName(self.__serviceName, ChannelType.RECV), Request, self.__Enqueue, 10)
 
     def Send(self, response: Response, timeout: float):
         if self.__sendChannel.Write(response, timeout):
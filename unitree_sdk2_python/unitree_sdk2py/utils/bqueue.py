@@ -40,6 +40,19 @@ class BQueue:
             self.__curLen -= 1
             return self.__queue.popleft()
 
+    def GetAll(self, timeout: float = None):
+        with self.__condition:
+            if not self.__queue:
+                try:
+                    self.__condition.wait(timeout)
+                except:
+                    return []
+
+            items = list(self.__queue)
+            self.__queue.clear()
+            self.__curLen = 0
+            return items
+
     def Clear(self):
         with self.__condition:
             if self.__queue: